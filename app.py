@@ -1,40 +1,137 @@
-from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for
+from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, g, Response
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from asgiref.wsgi import WsgiToAsgi
-from hypercorn.config import Config
-from hypercorn.asyncio import serve
 import asyncio
-import google.generativeai as genai
 import os
 from dotenv import load_dotenv
 
-from reportlab.pdfgen import canvas
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.lib.pagesizes import A4
-import arabic_reshaper
-from bidi.algorithm import get_display
 import io
 import json
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
-from collections import defaultdict
-import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import time
 from models.user import User
+from services.password_hashing import HasherBusy
+from models.contribution import Contribution
+from config.database import translation_cache as translation_cache_collection
+from config.database import analytics as analytics_collection
+from config.database import ping as database_available
+from services.transliterator import Transliterator
+from services.translation_memory import TranslationMemory
+from services.contribution_examples import RecentExamples, ExampleIndex
+from services.contribution_dedup import DedupIndex
+from services.gemini_client import AsyncGemini, InstrumentedModel, LazyModel
+from services.async_routes import AsyncRoutes
+from services.llm_json import parse_json_object, extract_json
+from services.batch_conversion import BatchJob
+from services.pdf_export import BENGALI_FONTS, create_pdf, font_key_for, font_name_for, warm_fonts
+from services.pdf_cache import PdfCache, pdf_key
+from services.pdf_jobs import PdfJobQueue, QueueFull
+from services.translation_cache import TranslationCache, text_words
+from services.analytics_store import AnalyticsStore
+from services.analytics_queue import AnalyticsQueue
+from services.startup import HealthCheck, StartupTasks
+from services.metrics import (
+    REGISTRY, REQUEST_SECONDS, GEMINI_RETRIES, STAGE_ERRORS, stage_summary, timed, track
+)
 
 
 # Load environment variables
 load_dotenv()
 
-# Configure Gemini API
-genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
-model = genai.GenerativeModel('gemini-pro')
+# Importing this module reads .env but otherwise does no I/O and loads no
+# heavy libraries: Gemini and ReportLab are imported on first use, indexes
+# are created by `python -m config.bootstrap`, and state built from the
+# database or the disk is loaded by startup tasks in the background. /ready
+# reports when they are done.
+startup = StartupTasks()
 
+# /ready reports the result of the last database ping, run every
+# DATABASE_PING_INTERVAL seconds on a background thread. Each ping gives up
+# after DATABASE_PING_TIMEOUT_MS, so an unreachable database shows up
+# within a few seconds and the probe itself never waits on Mongo.
+database_health = HealthCheck(
+    lambda: database_available(int(os.getenv('DATABASE_PING_TIMEOUT_MS', 1000))),
+    interval=float(os.getenv('DATABASE_PING_INTERVAL', 5))
+)
+
+# Gemini is configured and imported on the first call. Every call is timed
+# and errors counted in the 'gemini' metrics stage
+model = InstrumentedModel(LazyModel('gemini-pro', api_key=os.getenv('GOOGLE_API_KEY')))
+# Async access for the ASGI routes, limited to GEMINI_MAX_CONCURRENCY calls
+async_model = AsyncGemini(model, int(os.getenv('GEMINI_MAX_CONCURRENCY', 32)))
+
+# Convert words locally with the rule-based transliterator and only send
+# what it can't resolve to Gemini. Set LOCAL_TRANSLITERATION=0 to disable.
+LOCAL_TRANSLITERATION = os.getenv('LOCAL_TRANSLITERATION', '1') != '0'
+
+# Word translations learned from approved contributions
+translation_memory = TranslationMemory()
+
+def _load_translation_memory():
+    # Read everything first so a failed attempt adds nothing
+    for banglish, bengali in list(Contribution.get_approved_pairs()):
+        translation_memory.add_pair(banglish, bengali)
+
+startup.add('translation_memory', _load_translation_memory)
+Contribution.add_approval_listener(translation_memory.add_contributions)
+
+transliterator = Transliterator(memory=translation_memory)
+
+# Bump these whenever the matching prompt changes so cached results expire
+CONVERSION_PROMPT_VERSION = '3'
+TITLE_PROMPT_VERSION = '2'
+COMBINED_PROMPT_VERSION = '1'
+
+# /convert asks for the conversion, title and caption in one Gemini call.
+# Set COMBINED_CONVERSION=0 to convert first and then request the title.
+COMBINED_CONVERSION = os.getenv('COMBINED_CONVERSION', '1') != '0'
+
+# Serve /convert and /chat natively async (see asgi_app below); set
+# ASYNC_ROUTES=0 to serve every route through Flask. Streaming replies for
+# the converter and chat pages need the async routes.
+ASYNC_ROUTES = os.getenv('ASYNC_ROUTES', '1') != '0'
+STREAMING_RESPONSES = ASYNC_ROUTES and os.getenv('STREAMING_RESPONSES', '1') != '0'
+
+# Batch conversion packs up to BATCH_ITEMS_PER_PROMPT texts (and about
+# BATCH_CHARS_PER_PROMPT characters) into each Gemini request and runs up
+# to BATCH_MAX_PARALLEL of those requests at once
+BATCH_MAX_TEXTS = int(os.getenv('BATCH_MAX_TEXTS', 1000))
+BATCH_ITEMS_PER_PROMPT = int(os.getenv('BATCH_ITEMS_PER_PROMPT', 20))
+BATCH_CHARS_PER_PROMPT = int(os.getenv('BATCH_CHARS_PER_PROMPT', 2000))
+BATCH_MAX_PARALLEL = int(os.getenv('BATCH_MAX_PARALLEL', 4))
+
+# Cache Gemini results by input text. TRANSLATION_CACHE_BACKEND=mongo also
+# keeps them in MongoDB so they survive restarts and are shared by workers.
+# Each worker then rereads an entry from MongoDB after
+# TRANSLATION_CACHE_LOCAL_TTL seconds, so a word invalidated on approval
+# stops being served by every worker within that time.
+translation_cache = TranslationCache(
+    maxsize=int(os.getenv('TRANSLATION_CACHE_SIZE', 10000)),
+    ttl=int(os.getenv('TRANSLATION_CACHE_TTL', 7 * 24 * 3600)),
+    collection=translation_cache_collection if os.getenv('TRANSLATION_CACHE_BACKEND') == 'mongo' else None,
+    local_ttl=int(os.getenv('TRANSLATION_CACHE_LOCAL_TTL', 60))
+)
+Contribution.add_approval_listener(translation_cache.invalidate_contributions)
 
 
 app = Flask(__name__)
 app.secret_key = os.getenv('SECRET_KEY', 'your-secret-key')  # Change this in production
 
+# Time every Flask request by route; the async routes time themselves
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.teardown_request
+def record_request_time(error=None):
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_SECONDS.observe(time.perf_counter() - started, route, request.method)
+
 # Initialize Flask-Login
 login_manager = LoginManager()
 login_manager.init_app(app)
@@ -42,7 +139,8 @@ login_manager.login_view = 'login'
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.get_by_id(user_id)
+    with track('user_lookup'):
+        return User.get_cached(user_id)
 
 # Authentication routes
 @app.route('/login', methods=['GET', 'POST'])
@@ -52,7 +150,10 @@ def login():
         email = data.get('email')
         password = data.get('password')
         
-        user = User.check_password(email, password)
+        try:
+            user = User.check_password(email, password)
+        except HasherBusy as e:
+            return jsonify({'success': False, 'error': str(e)}), 429, {'Retry-After': '1'}
         if user:
             login_user(user)
             return jsonify({'success': True})
@@ -79,6 +180,8 @@ def signup():
             login_user(user)
             return jsonify({'success': True})
             
+        except HasherBusy as e:
+            return jsonify({'success': False, 'error': str(e)}), 429, {'Retry-After': '1'}
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -93,128 +196,194 @@ def logout():
     logout_user()
     return redirect(url_for('login'))
 
-# Create a directory for storing contributions if it doesn't exist
+# Contributions live in MongoDB; files saved by older versions are imported
+# with `python -m services.contribution_migration contributions/`
 CONTRIBUTIONS_DIR = Path('contributions')
-CONTRIBUTIONS_DIR.mkdir(exist_ok=True)
-
-# Available fonts for PDF
-BENGALI_FONTS = {
-    'kalpurush': {
-        'name': 'Kalpurush',
-        'file': 'kalpurush.ttf',
-        'display': 'Kalpurush (কালপুরুষ)'
-    },
-    'nikosh': {
-        'name': 'Nikosh',
-        'file': 'nikosh.ttf',
-        'display': 'Nikosh (নিকষ)'
-    },
-    'mitra': {
-        'name': 'Mitra',
-        'file': 'mitra.ttf',
-        'display': 'Mitra (মিত্র)'
-    },
-    'solaimanlipi': {
-        'name': 'MuktiNarrow',
-        'file': 'muktinarrow.ttf',
-        'display': 'Mukti Narrow (মুক্তি নার্দান)'
-    }
-}
-
-# Analytics storage
-class Analytics:
-    def __init__(self):
-        self.total_words_translated = 0
-        self.total_documents = 0
-        self.daily_translations = defaultdict(int)
-        self.font_usage = defaultdict(int)
-        self.contribution_count = 0
-        self.most_common_words = defaultdict(int)
-        self.avg_text_length = 0
-        self._total_length = 0
-        self.hourly_activity = defaultdict(int)
-        self.translation_lengths = []
-        self.success_rate = {'success': 0, 'failed': 0}
-        self.user_sessions = defaultdict(int)
-        # self.correction_stats = {'total_corrections': 0, 'correction_types': defaultdict(int)}
-
-analytics = Analytics()
+
+def check_contribution_files():
+    if CONTRIBUTIONS_DIR.is_dir() and any(CONTRIBUTIONS_DIR.glob('*.json')):
+        print(f"Found contribution files in {CONTRIBUTIONS_DIR}/; run services.contribution_migration to import them")
+
+startup.add('contribution_files', check_contribution_files)
+
+# Each font is parsed on its first export. Set PRELOAD_FONTS=1 to parse them
+# all as a startup task so no export waits for it, at the cost of loading
+# ReportLab into every worker.
+if os.getenv('PRELOAD_FONTS', '0') != '0':
+    startup.add('fonts', warm_fonts)
+
+# Exported PDFs are cached by content, PDF_CACHE_MEMORY_MB in memory and
+# PDF_CACHE_DISK_MB in PDF_CACHE_DIR (set it empty to keep memory only).
+# The disk tier is indexed by a startup task and used once that is done.
+pdf_cache = PdfCache(
+    max_memory_bytes=int(float(os.getenv('PDF_CACHE_MEMORY_MB', 64)) * 2**20),
+    directory=os.getenv('PDF_CACHE_DIR', 'pdf_cache'),
+    max_disk_bytes=int(float(os.getenv('PDF_CACHE_DISK_MB', 512)) * 2**20)
+)
+startup.add('pdf_cache', pdf_cache.load)
+
+# Texts longer than PDF_JOB_THRESHOLD characters are exported as background
+# jobs rendered by PDF_WORKERS processes. Finished PDFs are kept in
+# PDF_ARTIFACT_DIR, created by the first job, for PDF_JOB_TTL seconds.
+PDF_JOB_THRESHOLD = int(os.getenv('PDF_JOB_THRESHOLD', 20000))
+pdf_jobs = PdfJobQueue(
+    os.getenv('PDF_ARTIFACT_DIR', 'pdf_artifacts'),
+    max_workers=int(os.getenv('PDF_WORKERS', 2)),
+    max_pending=int(os.getenv('PDF_MAX_PENDING_JOBS', 50)),
+    ttl=int(os.getenv('PDF_JOB_TTL', 3600))
+)
+
+# Usage analytics, aggregated per hour and day and stored in MongoDB. Each
+# worker batches its counts and flushes them every ANALYTICS_FLUSH_SECONDS.
+# Word frequencies are approximated, tracking ANALYTICS_TOP_WORDS per bucket.
+# Set ANALYTICS_BACKEND=memory to keep them in process memory instead.
+analytics_store = AnalyticsStore(
+    collection=analytics_collection if os.getenv('ANALYTICS_BACKEND', 'mongo') == 'mongo' else None,
+    flush_interval=float(os.getenv('ANALYTICS_FLUSH_SECONDS', 10)),
+    word_capacity=int(os.getenv('ANALYTICS_TOP_WORDS', 1000))
+)
+analytics_store.start()
+
+# Requests only queue analytics events; a background thread aggregates them.
+# When ANALYTICS_QUEUE_SIZE events are waiting, new ones are dropped (or the
+# oldest, with ANALYTICS_OVERFLOW=drop_oldest) and counted.
+analytics = AnalyticsQueue(
+    analytics_store,
+    maxsize=int(os.getenv('ANALYTICS_QUEUE_SIZE', 10000)),
+    overflow=os.getenv('ANALYTICS_OVERFLOW', 'drop_newest')
+)
+analytics.start()
+
+# Gauges and counters read from the components that already track them
+def _cache_stats():
+    return {'translation': translation_cache.stats(), 'pdf': pdf_cache.stats()}
+
+REGISTRY.callback('banglish_cache_hits_total', 'Cache lookups answered from the cache',
+                  lambda: {(name,): stats['hits'] for name, stats in _cache_stats().items()},
+                  kind='counter', labelnames=('cache',))
+REGISTRY.callback('banglish_cache_misses_total', 'Cache lookups that missed',
+                  lambda: {(name,): stats['misses'] for name, stats in _cache_stats().items()},
+                  kind='counter', labelnames=('cache',))
+REGISTRY.callback('banglish_gemini_in_flight', 'Async Gemini calls in progress', lambda: async_model.in_flight)
+REGISTRY.callback('banglish_gemini_waiting', 'Async Gemini calls waiting for a slot', lambda: async_model.waiting)
+REGISTRY.callback('banglish_pdf_jobs_pending', 'PDF export jobs queued or rendering', lambda: pdf_jobs.pending)
+REGISTRY.callback('banglish_analytics_queued', 'Analytics events waiting to be aggregated',
+                  lambda: analytics.stats()['queued'])
+REGISTRY.callback('banglish_analytics_dropped_total', 'Analytics events dropped on overflow',
+                  lambda: analytics.dropped, kind='counter')
 
 def update_analytics(bengali_text, banglish_text=None, font=None):
     """Update analytics data"""
-    today = datetime.now().date()
-    hour = datetime.now().hour
-    
-    # Update word counts
-    bengali_words = len(re.findall(r'\S+', bengali_text))
-    analytics.total_words_translated += bengali_words
-    
-    # Update document count
-    analytics.total_documents += 1
-    
-    # Update daily translations
-    analytics.daily_translations[today] += 1
-    
-    # Update font usage if provided
-    if font:
-        analytics.font_usage[font] += 1
-    
-    # Update average text length
-    analytics._total_length += len(bengali_text)
-    analytics.avg_text_length = analytics._total_length / analytics.total_documents
-    
-    # Update most common words (from Banglish text if available)
-    if banglish_text:
-        words = re.findall(r'\w+', banglish_text.lower())
-        for word in words:
-            analytics.most_common_words[word] += 1
-    
-    # Track hourly activity
-    analytics.hourly_activity[hour] += 1
-    
-    # Track translation lengths
-    analytics.translation_lengths.append(len(bengali_text))
-    
-    # Update success rate
-    analytics.success_rate['success'] += 1
+    analytics.record_translation(bengali_text, banglish_text, font)
+
+# Submissions that repeat a stored contribution, exactly or nearly (see
+# services/contribution_dedup.py), add a vote to it instead of a new record.
+# A near duplicate differs only in the Banglish spelling, never in the
+# Bengali, so corrections are always stored. CONTRIBUTION_DEDUP_THRESHOLD
+# is the trigram similarity that counts as a near duplicate; set it to 1 to
+# fold exact duplicates only.
+contribution_dedup = DedupIndex(threshold=float(os.getenv('CONTRIBUTION_DEDUP_THRESHOLD', 0.85)))
+startup.add('contribution_dedup', lambda: contribution_dedup.extend(list(Contribution.get_all_pairs())))
+
+def save_contribution(banglish_text, bengali_text, feedback=None, user_id=None):
+    """Save user contributions to help improve the model.
+
+    Returns True for a new contribution, False when it was folded into an
+    existing one as a vote.
+    """
+    with track('contribution_dedup'):
+        duplicate = contribution_dedup.find(banglish_text, bengali_text)
+    if duplicate:
+        Contribution.add_vote(duplicate[0])
+        return False
+
+    contribution = Contribution(banglish_text, bengali_text, user_id, feedback)
+    created = contribution.save_or_vote()
+    contribution_dedup.add(contribution._id, banglish_text, bengali_text)
+    if not created:
+        return False
 
-def save_contribution(banglish_text, bengali_text, feedback=None):
-    """Save user contributions to help improve the model."""
-    timestamp = datetime.now().isoformat()
     contribution = {
         'banglish': banglish_text,
         'bengali': bengali_text,
-        'feedback': feedback,
-        'timestamp': timestamp
+        'feedback': feedback
     }
-    
-    # Save to a JSON file with timestamp in filename to avoid conflicts
-    filename = CONTRIBUTIONS_DIR / f'contribution_{timestamp.replace(":", "-")}.json'
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(contribution, f, ensure_ascii=False, indent=2)
-
-def enhance_prompt_with_contributions():
-    """Update the conversion prompt with recent user contributions."""
-    examples = []
-    
-    # Load recent contributions (limit to last 10 for performance)
-    contribution_files = sorted(CONTRIBUTIONS_DIR.glob('*.json'), reverse=True)[:10]
-    
-    for file in contribution_files:
-        try:
-            with open(file, 'r', encoding='utf-8') as f:
-                contribution = json.load(f)
-                example = f"- \"{contribution['banglish']}\" should be \"{contribution['bengali']}\""
-                # Add feedback as context if available
-                if contribution.get('feedback'):
-                    example += f"\n  Context: {contribution['feedback']}"
-                examples.append(example)
-        except Exception as e:
-            print(f"Error loading contribution {file}: {e}")
-    
-    return "\n".join(examples)
+    recent_examples.add(contribution)
+    example_index.add(contribution)
+    return True
+
+# Few-shot examples for the conversion prompt: the contributions most
+# similar to the input within a token budget, or the last 10 if none match.
+# Both are loaded once at startup and kept current by save_contribution()
+# and, when contributions are rejected, _drop_rejected_examples().
+PROMPT_EXAMPLES = int(os.getenv('PROMPT_EXAMPLES', 10))
+PROMPT_EXAMPLES_TOKEN_BUDGET = int(os.getenv('PROMPT_EXAMPLES_TOKEN_BUDGET', 400))
+example_index = ExampleIndex()
+recent_examples = RecentExamples(size=10)
+
+def _load_examples():
+    contributions = Contribution.get_examples()
+    example_index.extend(contributions)
+    recent_examples.extend(contributions[-10:])
+
+startup.add('prompt_examples', _load_examples)
+
+def _drop_rejected_examples(contributions):
+    rejected = [
+        {'banglish': c.banglish, 'bengali': c.bengali, 'feedback': c.feedback}
+        for c in contributions
+    ]
+    example_index.remove(rejected)
+    recent_examples.remove(rejected)
+
+Contribution.add_rejection_listener(_drop_rejected_examples)
+
+def enhance_prompt_with_contributions(text=None):
+    """Update the conversion prompt with user contributions relevant to text."""
+    if text:
+        examples = example_index.render(text, PROMPT_EXAMPLES, PROMPT_EXAMPLES_TOKEN_BUDGET)
+        if examples:
+            return examples
+    return recent_examples.rendered
 
 def convert_to_bengali(text):
+    if LOCAL_TRANSLITERATION:
+        bengali_text = transliterator.convert(text, convert_spans_with_gemini)
+        if bengali_text is not None:
+            return {'bengali_text': bengali_text}
+
+    return {
+        'bengali_text': convert_with_gemini(text),
+        # 'corrections': corrections,
+        # 'suggestions': suggestions,
+        # 'corrected_banglish': corrected_text
+    }
+
+def convert_spans_with_gemini(spans):
+    """Convert the spans the transliterator couldn't resolve in a single request."""
+    if len(spans) == 1:
+        return [convert_with_gemini(spans[0])]
+
+    lines = [line.strip() for line in convert_with_gemini("\n".join(spans)).split('\n') if line.strip()]
+    if len(lines) != len(spans):
+        return None
+    return lines
+
+def convert_with_gemini(text):
+    cached = translation_cache.get('convert', text, CONVERSION_PROMPT_VERSION)
+    if cached is not None:
+        return cached
+
+    bengali_text = _generate_conversion(text)
+    translation_cache.set('convert', text, CONVERSION_PROMPT_VERSION, bengali_text)
+    return bengali_text
+
+def _generate_conversion(text):
+    response = model.generate_content(build_conversion_prompt(text))
+    return response.text.strip()
+
+@timed('prompt_build')
+def build_conversion_prompt(text, output='text'):
     # First, correct any Banglish typing errors
     # corrected_text, corrections = banglish_corrector.correct_text(text)
     # suggestions = banglish_corrector.suggest_improvements(text)
@@ -225,13 +394,25 @@ def convert_to_bengali(text):
     #     for correction in corrections:
     #         analytics.correction_stats['correction_types'][correction['type']] += 1
 
+    if output == 'batch':
+        output_format = """The Banglish text above is a JSON array of separate items.
+    Respond with only a JSON array of their Bengali translations, one string per item, in the same order."""
+    elif output == 'titled':
+        output_format = """Respond with only a JSON object with these keys:
+    "bengali_text": the Bengali translation,
+    "title": a creative, catchy Bengali title for it (2-4 words),
+    "caption": a brief Bengali summary of it (15-20 words)."""
+    else:
+        output_format = "Only provide the Bengali translation, nothing else. Keep each line of the input on its own line."
+
     prompt = f"""Convert the following Banglish text to proper Bengali (Bangla) text:
     Banglish: {text}
     
-    Only provide the Bengali translation, nothing else. For example if the Banglish text is "tumi kemon acho" then the Bengali translation should be "তুমি কেমন আছো". If the Banglish text is "Ami valo achi" then the Bengali translation should be "আমি ভালো আছি".
+    {output_format}
+    For example if the Banglish text is "tumi kemon acho" then the Bengali translation should be "তুমি কেমন আছো". If the Banglish text is "Ami valo achi" then the Bengali translation should be "আমি ভালো আছি".
     
-    Recent user-contributed examples with context:
-    {enhance_prompt_with_contributions()}
+    User-contributed examples of similar text, with context:
+    {enhance_prompt_with_contributions(text)}
     
     Note: Pay attention to the context provided with examples to understand special cases,
     dialectal variations, and cultural nuances in the translations.
@@ -288,83 +469,139 @@ def convert_to_bengali(text):
     - "ঔপদেশিক" for "OUpodeshik"
     """
     
-    response = model.generate_content(prompt)
-    return {
-        'bengali_text': response.text.strip(),
-        # 'corrections': corrections,
-        # 'suggestions': suggestions,
-        # 'corrected_banglish': corrected_text
-    }
+    return prompt
 
 def generate_title_caption(text):
-    prompt = f"""Generate a creative title and caption in Bengali for the following Bengali text. 
+    cached = translation_cache.get('title_caption', text, TITLE_PROMPT_VERSION)
+    if cached is not None:
+        return tuple(cached)
+
+    title, caption = _generate_title_caption(text)
+    translation_cache.set('title_caption', text, TITLE_PROMPT_VERSION, [title, caption])
+    return title, caption
+
+@timed('title_generation')
+def _generate_title_caption(text):
+    response = model.generate_content(build_title_caption_prompt(text))
+    response.resolve()
+    return parse_title_caption(response.text)
+
+@timed('prompt_build')
+def build_title_caption_prompt(text):
+    return f"""Generate a creative title and caption in Bengali for the following Bengali text. 
     The title should be short (2-4 words) and catchy, while the caption should be a brief summary (15-20 words).
     
     Text: {text}
     
-    Provide the output in this format:
-    Title: <bengali_title>
-    Caption: <bengali_caption>
+    Respond with only a JSON object with the keys "title" and "caption".
     """
-    
-    response = model.generate_content(prompt)
-    response.resolve()
-    
-    # Split the response into title and caption
-    lines = response.text.strip().split('\n')
-    title = lines[0].replace('Title:', '').strip()
-    caption = lines[1].replace('Caption:', '').strip()
-    
-    return title, caption
 
-def create_pdf(bengali_text, title, caption, font_choice='kalpurush'):
-    # Create a PDF buffer
-    buffer = io.BytesIO()
-    
-    # Create the PDF object
-    pdf = canvas.Canvas(buffer, pagesize=A4)
-    
-    # Register Bengali font
-    font_info = BENGALI_FONTS.get(font_choice, BENGALI_FONTS['kalpurush'])
-    bengali_font_path = f"static/fonts/{font_info['file']}"
-    font_name = font_info['name']
-    pdfmetrics.registerFont(TTFont(font_name, bengali_font_path))
-    
-    # Set font
-    pdf.setFont(font_name, 16)
-    
-    # Add title
-    pdf.drawString(50, 800, title)
-    
-    # Add caption
-    pdf.setFont(font_name, 12)
-    pdf.drawString(50, 770, caption)
-    
-    # Add main text
-    pdf.setFont(font_name, 12)
-    text_object = pdf.beginText(50, 700)
-    
-    # Wrap text to fit page width
-    words = bengali_text.split()
-    line = ""
-    for word in words:
-        if len(line + " " + word) < 80:  # Adjust number based on page width
-            line += " " + word
-        else:
-            text_object.textLine(line.strip())
-            line = word
-    text_object.textLine(line.strip())
-    
-    pdf.drawText(text_object)
-    pdf.save()
+def parse_title_caption(response_text):
+    data = parse_json_object(response_text, ['title', 'caption'])
+    return data['title'], data['caption']
+
+def parse_combined_response(response_text):
+    data = parse_json_object(response_text, ['bengali_text', 'title', 'caption'])
+    return data['bengali_text'], data['title'], data['caption']
+
+def build_batch_prompt(items):
+    """Prompt for converting several separate texts in one request."""
+    return build_conversion_prompt(json.dumps(items, ensure_ascii=False), output='batch')
+
+def parse_batch_response(response_text, count):
+    translations = extract_json(response_text)
+    if not isinstance(translations, list) or len(translations) != count:
+        raise ValueError(f"Expected a JSON array of {count} translations")
+    if not all(isinstance(t, str) and t.strip() for t in translations):
+        raise ValueError("Response contains an empty translation")
+    return [t.strip() for t in translations]
+
+def new_batch_job(texts):
+    if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+        raise ValueError('texts must be a list of strings')
+    if len(texts) > BATCH_MAX_TEXTS:
+        raise ValueError(f'At most {BATCH_MAX_TEXTS} texts can be converted at once')
+    return BatchJob(
+        texts,
+        transliterator=transliterator if LOCAL_TRANSLITERATION else None,
+        cache=translation_cache,
+        cache_version=CONVERSION_PROMPT_VERSION,
+        items_per_chunk=BATCH_ITEMS_PER_PROMPT,
+        chars_per_chunk=BATCH_CHARS_PER_PROMPT
+    )
+
+def convert_batch(texts):
+    """Convert many Banglish texts, returning one result per text in input order.
+
+    Each result is {'success': True, 'bengali_text': ...} or
+    {'success': False, 'error': ...}.
+    """
+    job = new_batch_job(texts)
+    if job.chunks:
+        with ThreadPoolExecutor(max_workers=min(BATCH_MAX_PARALLEL, len(job.chunks))) as pool:
+            list(pool.map(lambda chunk: _convert_batch_chunk(job, chunk), job.chunks))
     
-    buffer.seek(0)
-    return buffer
+    results = job.results()
+    for text, result in zip(texts, results):
+        if result['success']:
+            update_analytics(result['bengali_text'], text)
+    return results
+
+def _convert_batch_chunk(job, chunk):
+    try:
+        response_text = model.generate_content(build_batch_prompt(chunk)).text
+    except Exception as e:
+        # API and network errors are not caused by any one item, so smaller
+        # requests would only fail again; the whole chunk fails at once
+        job.fail(chunk, e)
+        return
+    try:
+        translations = parse_batch_response(response_text, len(chunk))
+    except ValueError as e:
+        # A malformed answer can come from a single item, so split the chunk
+        # in half until the failure is pinned to single items
+        if len(chunk) == 1:
+            job.fail(chunk, e)
+            return
+        middle = len(chunk) // 2
+        GEMINI_RETRIES.inc(amount=2)
+        _convert_batch_chunk(job, chunk[:middle])
+        _convert_batch_chunk(job, chunk[middle:])
+        return
+    job.apply(chunk, translations)
+
+@timed('conversion')
+def convert_with_title_caption(text):
+    """Return (bengali_text, title, caption) in as few Gemini calls as possible."""
+    if COMBINED_CONVERSION:
+        draft = transliterator.draft(text) if LOCAL_TRANSLITERATION else None
+        if draft is None or draft.pending:
+            cached = translation_cache.get('convert_titled', text, COMBINED_PROMPT_VERSION)
+            if cached is not None:
+                return tuple(cached)
+
+            response = model.generate_content(build_conversion_prompt(text, output='titled'))
+            result = parse_combined_response(response.text)
+            _cache_combined(text, result)
+            return result
+        bengali_text = draft.fill([])
+    else:
+        bengali_text = convert_to_bengali(text)['bengali_text']
+
+    title, caption = generate_title_caption(bengali_text)
+    return bengali_text, title, caption
+
+def _cache_combined(text, result):
+    bengali_text, title, caption = result
+    translation_cache.set('convert_titled', text, COMBINED_PROMPT_VERSION, list(result))
+    translation_cache.set('convert', text, CONVERSION_PROMPT_VERSION, bengali_text)
+    translation_cache.set('title_caption', bengali_text, TITLE_PROMPT_VERSION, [title, caption])
 
 @app.route('/')
 @login_required
 def home():
-    return render_template('index.html', fonts=BENGALI_FONTS)
+    return render_template('index.html', fonts=BENGALI_FONTS, streaming=STREAMING_RESPONSES,
+                           pdf_job_threshold=PDF_JOB_THRESHOLD)
 
 @app.route('/convert', methods=['POST'])
 def convert():
@@ -372,9 +609,7 @@ def convert():
     banglish_text = data.get('text', '')
     
     try:
-        result = convert_to_bengali(banglish_text)
-        bengali_text = result['bengali_text']
-        title, caption = generate_title_caption(bengali_text)
+        bengali_text, title, caption = convert_with_title_caption(banglish_text)
         
         update_analytics(bengali_text, banglish_text)
         
@@ -387,6 +622,19 @@ def convert():
             # 'suggestions': result['suggestions'],
             # 'corrected_banglish': result['corrected_banglish']
         })
+    except Exception as e:
+        analytics.record_failure()
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/convert/batch', methods=['POST'])
+def convert_batch_route():
+    data = request.get_json()
+    
+    try:
+        return jsonify({
+            'success': True,
+            'results': convert_batch(data.get('texts', []))
+        })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
@@ -398,20 +646,71 @@ def export_pdf():
         title = data.get('title', '')
         caption = data.get('caption', '')
         font_choice = data.get('font', 'kalpurush')
+        # Update font usage analytics under the font actually used, since
+        # the name becomes a field in the stored counters
+        analytics.record_font(font_key_for(font_choice))
+        
+        # The cache key identifies the PDF, so it also serves as the ETag
+        key = pdf_key(bengali_text, title, caption, font_name_for(font_choice))
+        if request.if_none_match.contains(key):
+            response = app.response_class(status=304)
+            response.set_etag(key)
+            return response
         
-        pdf_buffer = create_pdf(bengali_text, title, caption, font_choice)
-        # Update font usage analytics
-        analytics.font_usage[font_choice] += 1
+        pdf_bytes = pdf_cache.get(key)
+        if pdf_bytes is None:
+            with track('pdf_render'):
+                pdf_bytes = create_pdf(bengali_text, title, caption, font_choice).getvalue()
+            pdf_cache.set(key, pdf_bytes)
         
-        return send_file(
-            pdf_buffer,
+        response = send_file(
+            io.BytesIO(pdf_bytes),
             download_name='bengali_text.pdf',
             as_attachment=True,
-            mimetype='application/pdf'
+            mimetype='application/pdf',
+            etag=key
+        )
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/export-pdf/jobs', methods=['POST'])
+def submit_pdf_job():
+    try:
+        data = request.get_json()
+        font_choice = data.get('font', 'kalpurush')
+        job_id = pdf_jobs.submit(
+            data.get('text', ''),
+            data.get('title', ''),
+            data.get('caption', ''),
+            font_choice
         )
+        analytics.record_font(font_key_for(font_choice))
+        return jsonify({'success': True, 'job_id': job_id, 'status': 'pending'})
+    except QueueFull as e:
+        return jsonify({'success': False, 'error': str(e)}), 429
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/export-pdf/jobs/<job_id>')
+def pdf_job_status(job_id):
+    status = pdf_jobs.status(job_id)
+    return jsonify(status), 404 if status['status'] == 'unknown' else 200
+
+@app.route('/export-pdf/jobs/<job_id>/download')
+def download_pdf_job(job_id):
+    path = pdf_jobs.artifact_path(job_id)
+    if path is None:
+        return jsonify({'success': False, 'error': 'PDF is not ready'}), 404
+    return send_file(
+        path.resolve(),
+        download_name='bengali_text.pdf',
+        as_attachment=True,
+        mimetype='application/pdf'
+    )
+
 @app.route('/contribute', methods=['POST'])
 def contribute():
     try:
@@ -426,126 +725,177 @@ def contribute():
                 'error': 'Both Banglish and Bengali texts are required'
             })
         
-        save_contribution(banglish_text, bengali_text, feedback)
+        user_id = current_user.get_id() if current_user.is_authenticated else None
+        if save_contribution(banglish_text, bengali_text, feedback, user_id):
+            # The new example changes how these words are converted
+            translation_cache.invalidate_words(text_words(banglish_text))
+            message = 'Thank you for your contribution!'
+        else:
+            message = 'Thank you! This translation was already submitted, so we counted your vote for it.'
         # Update contribution count
-        analytics.contribution_count += 1
+        analytics.record_contribution()
         
         return jsonify({
             'success': True,
-            'message': 'Thank you for your contribution!'
+            'message': message
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+CONTRIBUTIONS_PAGE_SIZE = int(os.getenv('CONTRIBUTIONS_PAGE_SIZE', 20))
+
 @app.route('/view-contributions')
 def view_contributions():
-    contributions = []
+    status = request.args.get('status') or None
+    user_id = request.args.get('user') or None
     try:
-        # Load all contributions, sorted by timestamp (newest first)
-        contribution_files = sorted(CONTRIBUTIONS_DIR.glob('*.json'), reverse=True)
-        
-        for file in contribution_files:
-            with open(file, 'r', encoding='utf-8') as f:
-                contribution = json.load(f)
-                # Add filename as ID
-                contribution['id'] = file.stem
-                contributions.append(contribution)
-        
-        return render_template('contributions.html', contributions=contributions)
+        contributions, next_cursor = Contribution.list_page(
+            status=status,
+            user_id=user_id,
+            cursor=request.args.get('cursor'),
+            limit=CONTRIBUTIONS_PAGE_SIZE
+        )
+        return render_template(
+            'contributions.html',
+            contributions=contributions,
+            next_cursor=next_cursor,
+            status=status,
+            user_id=user_id
+        )
     except Exception as e:
         return f"Error loading contributions: {str(e)}"
 
+@app.route('/admin')
+@login_required
+def admin_dashboard():
+    if not current_user.is_admin():
+        return redirect(url_for('home'))
+    try:
+        contributions, next_cursor = Contribution.get_pending_contributions(
+            cursor=request.args.get('cursor'),
+            limit=CONTRIBUTIONS_PAGE_SIZE
+        )
+    except ValueError as e:
+        return f"Error loading contributions: {str(e)}"
+    return render_template('admin/dashboard.html', contributions=contributions, next_cursor=next_cursor)
+
+@app.route('/admin/review-contribution', methods=['POST'])
+@login_required
+def review_contribution():
+    if not current_user.is_admin():
+        return jsonify({'success': False, 'error': 'Admin access required'}), 403
+    try:
+        data = request.get_json()
+        contribution = Contribution.get_by_id(data.get('contribution_id'))
+        if contribution is None:
+            return jsonify({'success': False, 'error': 'Contribution not found'})
+        
+        action = data.get('action')
+        if action == 'approve':
+            contribution.approve(current_user.get_id(), data.get('comment'))
+        elif action == 'reject':
+            contribution.reject(current_user.get_id(), data.get('comment'))
+        else:
+            return jsonify({'success': False, 'error': 'Unknown action'})
+
+        return jsonify({'success': True})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/admin/review-contributions', methods=['POST'])
+@login_required
+def review_contributions():
+    if not current_user.is_admin():
+        return jsonify({'success': False, 'error': 'Admin access required'}), 403
+    try:
+        data = request.get_json()
+        contribution_ids = data.get('contribution_ids')
+        if not isinstance(contribution_ids, list) or not contribution_ids:
+            return jsonify({'success': False, 'error': 'No contributions selected'})
+
+        action = data.get('action')
+        if action == 'approve':
+            results = Contribution.approve_many(contribution_ids, current_user.get_id(), data.get('comment'))
+        elif action == 'reject':
+            results = Contribution.reject_many(contribution_ids, current_user.get_id(), data.get('comment'))
+        else:
+            return jsonify({'success': False, 'error': 'Unknown action'})
+
+        return jsonify({
+            'success': True,
+            'results': results,
+            'counts': Counter(item['result'] for item in results)
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
 @app.route('/analytics')
 def view_analytics():
-    # Prepare analytics data
-    data = {
-        'total_words': analytics.total_words_translated,
-        'total_documents': analytics.total_documents,
-        'contributions': analytics.contribution_count,
-        'avg_length': round(analytics.avg_text_length, 2),
-        
-        # Get daily translations for the last 7 days
-        'daily_stats': {
-            (datetime.now().date() - timedelta(days=i)): 
-            analytics.daily_translations[datetime.now().date() - timedelta(days=i)]
-            for i in range(7)
-        },
-        
-        # Get top 10 most common words
-        'common_words': dict(sorted(
-            analytics.most_common_words.items(), 
-            key=lambda x: x[1], 
-            reverse=True
-        )[:10]),
-        
-        # Get font usage statistics
-        'font_usage': dict(analytics.font_usage),
-        
-        # Add new analytics
-        'hourly_stats': dict(analytics.hourly_activity),
-        'avg_translation_length': sum(analytics.translation_lengths) / len(analytics.translation_lengths) if analytics.translation_lengths else 0,
-        'success_rate': (
-            analytics.success_rate['success'] / 
-            (analytics.success_rate['success'] + analytics.success_rate['failed'])
-            * 100 if analytics.success_rate['success'] + analytics.success_rate['failed'] > 0 else 0
-        ),
-        'peak_hours': sorted(
-            analytics.hourly_activity.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:3]
+    # Totals plus the last 7 days, read from the precomputed rollups
+    data = analytics_store.summary(days=7)
+    data['avg_length'] = round(data['avg_length'], 2)
+    data['avg_translation_length'] = data['avg_length']
+    data['performance'] = stage_summary()
+    data['cache_hit_rates'] = {
+        name: round(stats['hit_rate'] * 100, 1) for name, stats in _cache_stats().items()
     }
+    data['gemini_errors'] = STAGE_ERRORS.value('gemini') + STAGE_ERRORS.value('gemini_stream')
+    data['gemini_retries'] = GEMINI_RETRIES.value()
     
     return render_template('analytics.html', data=data)
 
+@app.route('/ready')
+def ready():
+    """Readiness probe: 503 until the startup tasks finish and while the database is unreachable."""
+    database = database_health.ok
+    is_ready = startup.ready and database
+    return jsonify({
+        'ready': is_ready,
+        'database': database,
+        'database_checked': database_health.age(),
+        'startup': startup.status()
+    }), 200 if is_ready else 503
+
+@app.route('/metrics')
+def metrics():
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/analytics/data')
 def get_analytics_data():
-    days = int(request.args.get('days', 7))
-    end_date = datetime.now().date()
-    start_date = end_date - timedelta(days=days)
-    
-    # Filter data for the selected time period
-    filtered_data = {
-        'daily_stats': {
-            date: analytics.daily_translations[date]
-            for date in (start_date + timedelta(days=x) for x in range(days))
-        },
-        'total_words': sum(
-            count for date, count in analytics.daily_translations.items()
-            if start_date <= date <= end_date
-        ),
-        'total_documents': sum(
-            1 for date in analytics.daily_translations.keys()
-            if start_date <= date <= end_date
-        ),
-        'avg_length': analytics.avg_text_length
-    }
+    days = max(1, min(int(request.args.get('days', 7)), 366))
+    summary = analytics_store.summary(days=days)
     
     return jsonify({
         'daily_stats': {
-            'keys': list(filtered_data['daily_stats'].keys()),
-            'values': list(filtered_data['daily_stats'].values())
+            'keys': list(summary['daily_stats'].keys()),
+            'values': list(summary['daily_stats'].values())
         },
-        'total_words': filtered_data['total_words'],
-        'total_documents': filtered_data['total_documents'],
-        'avg_length': round(filtered_data['avg_length'], 2)
+        'total_words': summary['window_words'],
+        'total_documents': summary['window_documents'],
+        'avg_length': round(summary['window_avg_length'], 2)
     })
 
+def is_banglish(message):
+    return all(ord(char) < 128 for char in message)
+
 def process_chat_message(message):
     """Process chat messages and return response in Bengali"""
     
     # Detect if the message is in Banglish
-    is_banglish = all(ord(char) < 128 for char in message)
-    
-    if is_banglish:
+    if is_banglish(message):
         # First convert Banglish to Bengali
         result = convert_to_bengali(message)
         bengali_query = result['bengali_text']
     else:
         bengali_query = message
     
+    response = model.generate_content(build_chat_prompt(bengali_query))
+    return response.text.strip()
+
+@timed('prompt_build')
+def build_chat_prompt(bengali_query):
     # Improved prompt with more context and examples
-    prompt = f"""You are a helpful and friendly Bengali language chatbot. Respond naturally to the following query in Bengali script. Maintain a conversational tone and provide relevant responses based on the query context.
+    return f"""You are a helpful and friendly Bengali language chatbot. Respond naturally to the following query in Bengali script. Maintain a conversational tone and provide relevant responses based on the query context.
 
 Query: {bengali_query}
 
@@ -566,9 +916,6 @@ Example conversations:
 
 Remember to respond naturally and contextually to the specific query: {bengali_query}"""
 
-    response = model.generate_content(prompt)
-    return response.text.strip()
-
 @app.route('/chat', methods=['POST'])
 @login_required
 def chat():
@@ -599,11 +946,348 @@ def chat():
 @app.route('/chat')
 @login_required
 def chat_page():
-    return render_template('chat.html')
+    return render_template('chat.html', streaming=STREAMING_RESPONSES)
+
+# Async request path: the ASGI app serves POST /convert and POST /chat as
+# coroutines so requests waiting on Gemini don't each hold a worker thread,
+# and POST /login and /signup so password hashing doesn't hold the single
+# thread WsgiToAsgi runs Flask on. Everything else goes through Flask.
+async def _cache_call(method, *args):
+    # The Mongo cache tier does blocking I/O; keep it off the event loop
+    if translation_cache.collection is None:
+        return method(*args)
+    return await asyncio.to_thread(method, *args)
+
+async def convert_to_bengali_async(text):
+    if LOCAL_TRANSLITERATION:
+        draft = transliterator.draft(text)
+        translations = await convert_spans_with_gemini_async(draft.pending) if draft.pending else []
+        bengali_text = draft.fill(translations)
+        if bengali_text is not None:
+            return {'bengali_text': bengali_text}
+
+    return {'bengali_text': await convert_with_gemini_async(text)}
+
+async def convert_spans_with_gemini_async(spans):
+    if len(spans) == 1:
+        return [await convert_with_gemini_async(spans[0])]
+
+    response_text = await convert_with_gemini_async("\n".join(spans))
+    lines = [line.strip() for line in response_text.split('\n') if line.strip()]
+    if len(lines) != len(spans):
+        return None
+    return lines
+
+async def convert_with_gemini_async(text):
+    cached = await _cache_call(translation_cache.get, 'convert', text, CONVERSION_PROMPT_VERSION)
+    if cached is not None:
+        return cached
+
+    bengali_text = await async_model.generate(build_conversion_prompt(text))
+    await _cache_call(translation_cache.set, 'convert', text, CONVERSION_PROMPT_VERSION, bengali_text)
+    return bengali_text
+
+async def generate_title_caption_async(text):
+    cached = await _cache_call(translation_cache.get, 'title_caption', text, TITLE_PROMPT_VERSION)
+    if cached is not None:
+        return tuple(cached)
+
+    with track('title_generation'):
+        title, caption = parse_title_caption(await async_model.generate(build_title_caption_prompt(text)))
+    await _cache_call(translation_cache.set, 'title_caption', text, TITLE_PROMPT_VERSION, [title, caption])
+    return title, caption
+
+@timed('conversion')
+async def convert_with_title_caption_async(text):
+    if COMBINED_CONVERSION:
+        draft = transliterator.draft(text) if LOCAL_TRANSLITERATION else None
+        if draft is None or draft.pending:
+            cached = await _cache_call(translation_cache.get, 'convert_titled', text, COMBINED_PROMPT_VERSION)
+            if cached is not None:
+                return tuple(cached)
+
+            result = parse_combined_response(
+                await async_model.generate(build_conversion_prompt(text, output='titled'))
+            )
+            await _cache_call(_cache_combined, text, result)
+            return result
+        bengali_text = draft.fill([])
+    else:
+        bengali_text = (await convert_to_bengali_async(text))['bengali_text']
+
+    title, caption = await generate_title_caption_async(bengali_text)
+    return bengali_text, title, caption
+
+async def convert_batch_async(texts):
+    job = await _cache_call(new_batch_job, texts)
+    limit = asyncio.Semaphore(BATCH_MAX_PARALLEL)
+
+    async def run(chunk):
+        # Errors are handled as in _convert_batch_chunk: only malformed
+        # answers are split, API errors fail the whole chunk
+        try:
+            async with limit:
+                response_text = await async_model.generate(build_batch_prompt(chunk))
+        except Exception as e:
+            job.fail(chunk, e)
+            return
+        try:
+            translations = parse_batch_response(response_text, len(chunk))
+        except ValueError as e:
+            if len(chunk) == 1:
+                job.fail(chunk, e)
+                return
+            middle = len(chunk) // 2
+            GEMINI_RETRIES.inc(amount=2)
+            await asyncio.gather(run(chunk[:middle]), run(chunk[middle:]))
+            return
+        await _cache_call(job.apply, chunk, translations)
+
+    await asyncio.gather(*(run(chunk) for chunk in job.chunks))
+    
+    results = job.results()
+    for text, result in zip(texts, results):
+        if result['success']:
+            update_analytics(result['bengali_text'], text)
+    return results
+
+async def process_chat_message_async(message):
+    if is_banglish(message):
+        result = await convert_to_bengali_async(message)
+        bengali_query = result['bengali_text']
+    else:
+        bengali_query = message
+
+    return await async_model.generate(build_chat_prompt(bengali_query))
+
+asgi_app = AsyncRoutes(app)
+
+@asgi_app.route('/login')
+async def login_async(request):
+    data = request.get_json()
+    
+    try:
+        user = await User.check_password_async(data.get('email'), data.get('password'))
+    except HasherBusy as e:
+        return 429, {'success': False, 'error': str(e)}, {'Retry-After': '1'}
+    if user:
+        return 200, {'success': True}, request.login_user(user)
+    
+    return 200, {
+        'success': False,
+        'error': 'Invalid email or password'
+    }
+
+@asgi_app.route('/signup')
+async def signup_async(request):
+    data = request.get_json()
+    
+    try:
+        user = await User(
+            username=data.get('username'),
+            email=data.get('email'),
+            password=data.get('password')
+        ).save_async()
+        
+        return 200, {'success': True}, request.login_user(user)
+    except HasherBusy as e:
+        return 429, {'success': False, 'error': str(e)}, {'Retry-After': '1'}
+    except Exception as e:
+        return 200, {
+            'success': False,
+            'error': str(e)
+        }
+
+@asgi_app.route('/convert')
+async def convert_async(request):
+    banglish_text = request.get_json().get('text', '')
+    
+    try:
+        bengali_text, title, caption = await convert_with_title_caption_async(banglish_text)
+        
+        update_analytics(bengali_text, banglish_text)
+        
+        return 200, {
+            'success': True,
+            'bengali_text': bengali_text,
+            'title': title,
+            'caption': caption
+        }
+    except Exception as e:
+        analytics.record_failure()
+        return 200, {'success': False, 'error': str(e)}
+
+@asgi_app.route('/convert/batch')
+async def convert_batch_async_route(request):
+    try:
+        return 200, {
+            'success': True,
+            'results': await convert_batch_async(request.get_json().get('texts', []))
+        }
+    except Exception as e:
+        return 200, {'success': False, 'error': str(e)}
+
+@asgi_app.route('/chat')
+async def chat_async(request):
+    if not request.user_id:
+        return request.login_redirect()
+
+    try:
+        message = request.get_json().get('message', '')
+        
+        if not message:
+            return 200, {
+                'success': False,
+                'error': 'Message is required'
+            }
+        
+        response = await process_chat_message_async(message)
+        
+        return 200, {
+            'success': True,
+            'response': response,
+            'timestamp': datetime.now().isoformat()
+        }
+    except Exception as e:
+        return 200, {
+            'success': False,
+            'error': str(e)
+        }
+
+# Streaming variants send Server-Sent Events: {'type': 'chunk', 'text'} as
+# Gemini produces text, then one 'done' event with the full result, or an
+# 'error' event
+@asgi_app.route('/convert/stream')
+async def convert_stream(request):
+    return _convert_events(request.get_json().get('text', ''))
+
+async def _convert_events(banglish_text):
+    try:
+        draft = transliterator.draft(banglish_text) if LOCAL_TRANSLITERATION else None
+        if draft is not None and not draft.pending:
+            bengali_text = draft.fill([])
+            yield {'type': 'chunk', 'text': bengali_text}
+        elif draft is not None:
+            translations = []
+            async for text in _stream_spans(draft, translations):
+                yield {'type': 'chunk', 'text': text}
+            bengali_text = draft.fill(translations)
+            if bengali_text is None:
+                # The reply didn't line up with the spans; the done event
+                # replaces what was streamed with a whole-text conversion
+                bengali_text = await convert_with_gemini_async(banglish_text)
+        else:
+            chunks = []
+            async for chunk in stream_with_gemini_async(banglish_text):
+                chunks.append(chunk)
+                yield {'type': 'chunk', 'text': chunk}
+            bengali_text = ''.join(chunks).strip()
+
+        title, caption = await generate_title_caption_async(bengali_text)
+        update_analytics(bengali_text, banglish_text)
+        
+        yield {
+            'type': 'done',
+            'bengali_text': bengali_text,
+            'title': title,
+            'caption': caption
+        }
+    except Exception as e:
+        analytics.record_failure()
+        yield {'type': 'error', 'error': str(e)}
+
+async def _stream_spans(draft, translations):
+    """Yield a draft's Bengali text as Gemini converts its pending spans.
+
+    Only the spans are sent, one per line, and each translated line is
+    yielded with the resolved text that follows it. Translations are
+    appended to the given list for the caller to fill the draft with.
+    """
+    gaps = draft.gaps()
+
+    def finish(line):
+        translation = line.strip()
+        if not translation:
+            return ''
+        translations.append(translation)
+        return translation + (gaps[len(translations)] if len(translations) < len(gaps) else '')
+
+    if gaps[0]:
+        yield gaps[0]
+    line = ''
+    async for chunk in stream_with_gemini_async("\n".join(draft.pending)):
+        *lines, line = (line + chunk).split('\n')
+        for text in map(finish, lines):
+            if text:
+                yield text
+    text = finish(line)
+    if text:
+        yield text
+
+async def stream_with_gemini_async(text):
+    """Yield the conversion of text as Gemini produces it, from the cache if there."""
+    cached = await _cache_call(translation_cache.get, 'convert', text, CONVERSION_PROMPT_VERSION)
+    if cached is not None:
+        yield cached
+        return
+
+    chunks = []
+    async for chunk in async_model.stream(build_conversion_prompt(text)):
+        chunks.append(chunk)
+        yield chunk
+    await _cache_call(translation_cache.set, 'convert', text, CONVERSION_PROMPT_VERSION, ''.join(chunks).strip())
+
+@asgi_app.route('/chat/stream')
+async def chat_stream(request):
+    if not request.user_id:
+        return request.login_redirect()
+
+    message = request.get_json().get('message', '')
+    if not message:
+        return 200, {
+            'success': False,
+            'error': 'Message is required'
+        }
+    return _chat_events(message)
+
+async def _chat_events(message):
+    try:
+        if is_banglish(message):
+            result = await convert_to_bengali_async(message)
+            bengali_query = result['bengali_text']
+        else:
+            bengali_query = message
+
+        chunks = []
+        async for chunk in async_model.stream(build_chat_prompt(bengali_query)):
+            chunks.append(chunk)
+            yield {'type': 'chunk', 'text': chunk}
+        
+        yield {
+            'type': 'done',
+            'response': ''.join(chunks).strip(),
+            'timestamp': datetime.now().isoformat()
+        }
+    except Exception as e:
+        yield {'type': 'error', 'error': str(e)}
+
+startup.start()
+database_health.start()
 
 if __name__ == '__main__':
+    import importlib.machinery
+    import sys
+    from hypercorn.config import Config
+    from hypercorn.asyncio import serve
+
+    # Spawned PDF workers would otherwise re-run this file as __mp_main__,
+    # building a Mongo client and starting the startup and analytics threads
+    # in each of them. A main module named __main__ is left alone by spawn.
+    sys.modules['__main__'].__spec__ = importlib.machinery.ModuleSpec('__main__', None)
+
     config = Config()
     config.bind = ["localhost:5000"]
     config.use_reloader = True
-    asgi_app = WsgiToAsgi(app)
+    if not ASYNC_ROUTES:
+        asgi_app = WsgiToAsgi(app)
     asyncio.run(serve(asgi_app, config))
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""Offline stand-ins for Gemini and MongoDB.
+
+install() must run before app (or config.database) is imported: it
+points pymongo at mongomock, creates the indexes and replaces
+genai.GenerativeModel with FakeGenerativeModel, so the whole app runs
+without network access.
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import tempfile
+import time
+
+_BANGLISH_RE = re.compile(r'Banglish: (.*?)\n    \n', re.DOTALL)
+_TEXT_RE = re.compile(r'Text: (.*?)\n    \n', re.DOTALL)
+
+FILLER_WORDS = ['আমি', 'তুমি', 'ভালো', 'আছি', 'কেমন', 'আজকে', 'বাংলা', 'লিখি', 'গান', 'বই']
+
+
+def fake_bengali(text):
+    """Return a Bengali-looking string with one word per input word, line by line."""
+    return '\n'.join(
+        ' '.join(FILLER_WORDS[len(word) % len(FILLER_WORDS)] for word in line.split())
+        for line in text.split('\n')
+    )
+
+
+def default_responder(prompt):
+    """Answer each of the app's prompt types in the shape it expects."""
+    match = _BANGLISH_RE.search(prompt)
+    if match:
+        text = match.group(1)
+        if 'JSON array of separate items' in prompt:
+            return json.dumps([fake_bengali(item) for item in json.loads(text)], ensure_ascii=False)
+        if '"bengali_text"' in prompt:
+            return json.dumps({
+                'bengali_text': fake_bengali(text),
+                'title': 'বাংলা লেখা',
+                'caption': 'একটি ছোট বাংলা লেখার সারাংশ'
+            }, ensure_ascii=False)
+        return fake_bengali(text)
+    if _TEXT_RE.search(prompt):
+        return '{"title": "বাংলা লেখা", "caption": "একটি ছোট বাংলা লেখার সারাংশ"}'
+    return 'আমি ভালো আছি, আপনার সাথে কথা বলে ভালো লাগছে।'
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+    def resolve(self):
+        pass
+
+
+class _FakeStream:
+    def __init__(self, text, chunk_size, delay):
+        self.text = text
+        self.chunk_size = chunk_size
+        self.delay = delay
+
+    async def _chunks(self):
+        for start in range(0, len(self.text), self.chunk_size):
+            await asyncio.sleep(self.delay)
+            yield FakeResponse(self.text[start:start + self.chunk_size])
+
+    def __aiter__(self):
+        return self._chunks()
+
+
+class FakeGenerativeModel:
+    """A GenerativeModel with configurable latency, failures and replies.
+
+    Settings are class attributes so install() can configure every model
+    the app creates.
+    """
+
+    latency = 0.2
+    jitter = 0.05
+    error_rate = 0.0
+    stream_chunk_size = 20
+    responder = staticmethod(default_responder)
+    calls = 0
+
+    def __init__(self, model_name='gemini-pro', **kwargs):
+        self.model_name = model_name
+
+    def _delay(self):
+        return max(0.0, random.gauss(self.latency, self.jitter)) if self.jitter else self.latency
+
+    def _reply(self, prompt):
+        type(self).calls += 1
+        if self.error_rate and random.random() < self.error_rate:
+            raise RuntimeError('Fake Gemini error')
+        return type(self).responder(prompt)
+
+    def generate_content(self, prompt, **kwargs):
+        time.sleep(self._delay())
+        return FakeResponse(self._reply(prompt))
+
+    async def generate_content_async(self, prompt, stream=False, **kwargs):
+        delay = self._delay()
+        if stream:
+            # Spread the latency over the chunks, the first arriving soonest
+            text = self._reply(prompt)
+            chunks = max(1, -(-len(text) // self.stream_chunk_size))
+            await asyncio.sleep(delay / 2)
+            return _FakeStream(text, self.stream_chunk_size, delay / 2 / chunks)
+        await asyncio.sleep(delay)
+        return FakeResponse(self._reply(prompt))
+
+
+def install(latency=0.2, jitter=0.05, error_rate=0.0, responder=None):
+    """Patch pymongo and google.generativeai for an offline run."""
+    import mongomock
+    import pymongo
+    import google.generativeai as genai
+
+    pymongo.MongoClient = mongomock.MongoClient
+    FakeGenerativeModel.latency = latency
+    FakeGenerativeModel.jitter = jitter
+    FakeGenerativeModel.error_rate = error_rate
+    if responder is not None:
+        FakeGenerativeModel.responder = staticmethod(responder)
+    genai.GenerativeModel = FakeGenerativeModel
+
+    # Keep caches and artifacts out of the working tree
+    scratch = tempfile.mkdtemp(prefix='banglish-bench-')
+    os.environ.setdefault('PDF_CACHE_DIR', os.path.join(scratch, 'pdf_cache'))
+    os.environ.setdefault('PDF_ARTIFACT_DIR', os.path.join(scratch, 'pdf_artifacts'))
+    os.environ.setdefault('GOOGLE_API_KEY', 'offline')
+
+    # The app leaves index creation to config.bootstrap; the unique ones
+    # matter for contribution dedup
+    from config.database import ensure_indexes
+    ensure_indexes()
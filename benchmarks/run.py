@@ -0,0 +1,388 @@
+"""Offline throughput and latency benchmarks.
+
+Runs the app against FakeGenerativeModel and mongomock, drives each
+scenario at a fixed concurrency and reports requests per second, latency
+percentiles and peak memory. Each scenario runs in a fresh interpreter,
+so its peak RSS is its own rather than the largest of the scenarios run
+before it. Results can be stored as baselines and later runs compared
+against them, exiting non-zero on a regression.
+
+    python -m benchmarks.run                      # run and compare with baselines
+    python -m benchmarks.run --save-baseline      # record new baselines
+    python -m benchmarks.run --scenario convert_asgi --concurrency 64 --requests 2000
+    python -m benchmarks.run --scenario app_import   # worker startup time and memory
+
+Baselines depend on the machine, so record them where the comparison
+will run.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmarks import fakes
+
+BASELINES_PATH = Path(__file__).resolve().parent / 'baselines.json'
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Fresh interpreters started by the app_import scenario
+IMPORT_RUNS = 10
+# Runs in the child: time `import app` and report peak RSS in MB. There are
+# no fakes here, since importing the app must not touch Gemini or MongoDB.
+# Linux carries ru_maxrss over from the forking parent, so read the
+# child's own high-water mark from /proc where there is one.
+IMPORT_PROBE = """
+import os, resource, sys, time
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+try:
+    with open('/proc/self/status') as status:
+        peak = next(int(line.split()[1]) for line in status if line.startswith('VmHWM:')) / 2**10
+except OSError:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (2**20 if sys.platform == 'darwin' else 2**10)
+print(elapsed, peak, flush=True)
+os._exit(0)
+"""
+
+BANGLISH_WORDS = [
+    'ami', 'tumi', 'se', 'amra', 'bhalo', 'achi', 'kemon', 'acho', 'ajke', 'kal',
+    'bari', 'jabo', 'khabo', 'bhat', 'mach', 'boi', 'porbo', 'gaan', 'shunbo', 'brishti',
+    'hocche', 'onek', 'sundor', 'din', 'raat', 'ghum', 'ashche', 'school', 'office', 'bondhu',
+    'tomar', 'amar', 'nam', 'ki', 'keno', 'kothay', 'kobe', 'jhor', 'akash', 'nodi'
+]
+
+
+def make_texts(count, distinct, min_words=5, max_words=30, seed=1):
+    """Return count Banglish texts drawn from distinct unique ones."""
+    rng = random.Random(seed)
+    pool = [
+        ' '.join(rng.choice(BANGLISH_WORDS) for _ in range(rng.randint(min_words, max_words))) + f" {i}"
+        for i in range(distinct)
+    ]
+    return [pool[i % distinct] for i in range(count)]
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def peak_rss_mb():
+    # Linux carries ru_maxrss over from the parent that started this
+    # process, so prefer its own high-water mark from /proc
+    try:
+        with open('/proc/self/status') as status:
+            return next(int(line.split()[1]) for line in status if line.startswith('VmHWM:')) / 2**10
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak / (2**20 if sys.platform == 'darwin' else 2**10)
+
+
+def summarize(latencies, elapsed, errors):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 1),
+        'peak_rss_mb': round(peak_rss_mb(), 1)
+    }
+
+
+def run_threaded(call, inputs, concurrency):
+    """Run call(input) for every input on concurrency threads."""
+    def timed(item):
+        start = time.perf_counter()
+        try:
+            ok = call(item)
+        except Exception as e:
+            print(f"Error in benchmark call: {e}")
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, inputs))
+    elapsed = time.perf_counter() - start
+    return summarize([r[0] for r in results], elapsed, sum(1 for r in results if not r[1]))
+
+
+def run_async(call, inputs, concurrency):
+    """Run await call(input) for every input with at most concurrency in flight."""
+    async def main():
+        limit = asyncio.Semaphore(concurrency)
+
+        async def timed(item):
+            async with limit:
+                start = time.perf_counter()
+                try:
+                    ok = await call(item)
+                except Exception as e:
+                    print(f"Error in benchmark call: {e}")
+                    ok = False
+                return time.perf_counter() - start, ok
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(timed(item) for item in inputs))
+        return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(main())
+    return summarize([r[0] for r in results], elapsed, sum(1 for r in results if not r[1]))
+
+
+async def asgi_request(asgi_app, method, path, payload, cookie=None):
+    """Send one request straight into the ASGI app; return (status, body)."""
+    body = json.dumps(payload).encode('utf-8')
+    headers = [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+    if cookie:
+        headers.append((b'cookie', cookie.encode('latin-1')))
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': method, 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'query_string': b'', 'root_path': '', 'headers': headers,
+        'client': ('127.0.0.1', 0), 'server': ('127.0.0.1', 5000)
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    await asgi_app(scope, receive, send)
+    return sent[0]['status'], b''.join(m.get('body', b'') for m in sent[1:])
+
+
+def _json_ok(body):
+    return json.loads(body).get('success', False)
+
+
+def create_user(app_module):
+    """Insert a benchmark user and return (user id, session cookie)."""
+    from config.database import users
+    user_id = str(users.insert_one({
+        'username': f"bench{time.time_ns()}",
+        'email': f"bench{time.time_ns()}@example.com",
+        'password': b''
+    }).inserted_id)
+    flask_app = app_module.app
+    serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+    cookie = f"{flask_app.config['SESSION_COOKIE_NAME']}={serializer.dumps({'_user_id': user_id, '_fresh': True})}"
+    return user_id, cookie
+
+
+def scenario_convert_function(app_module, texts, concurrency):
+    return run_threaded(lambda text: bool(app_module.convert_to_bengali(text)['bengali_text']), texts, concurrency)
+
+
+def scenario_convert_flask(app_module, texts, concurrency):
+    import threading
+    local = threading.local()
+
+    def call(text):
+        if not hasattr(local, 'client'):
+            local.client = app_module.app.test_client()
+        return local.client.post('/convert', json={'text': text}).get_json()['success']
+    return run_threaded(call, texts, concurrency)
+
+
+def scenario_convert_asgi(app_module, texts, concurrency):
+    async def call(text):
+        status, body = await asgi_request(app_module.asgi_app, 'POST', '/convert', {'text': text})
+        return status == 200 and _json_ok(body)
+    return run_async(call, texts, concurrency)
+
+
+def scenario_chat_flask(app_module, texts, concurrency):
+    import threading
+    user_id, _ = create_user(app_module)
+    local = threading.local()
+
+    def call(text):
+        if not hasattr(local, 'client'):
+            local.client = app_module.app.test_client()
+            with local.client.session_transaction() as session:
+                session['_user_id'] = user_id
+                session['_fresh'] = True
+        return local.client.post('/chat', json={'message': text}).get_json()['success']
+    return run_threaded(call, texts, concurrency)
+
+
+def scenario_chat_asgi(app_module, texts, concurrency):
+    _, cookie = create_user(app_module)
+
+    async def call(text):
+        status, body = await asgi_request(app_module.asgi_app, 'POST', '/chat', {'message': text}, cookie)
+        return status == 200 and _json_ok(body)
+    return run_async(call, texts, concurrency)
+
+
+def scenario_create_pdf(app_module, texts, concurrency):
+    from services.pdf_export import create_pdf
+    bengali = [fakes.fake_bengali(' '.join([text] * 20)) for text in texts]
+    return run_threaded(
+        lambda text: bool(create_pdf(text, 'বাংলা লেখা', 'একটি ছোট বাংলা লেখা', 'kalpurush').getbuffer().nbytes),
+        bengali, concurrency
+    )
+
+
+def scenario_app_import(app_module, texts, concurrency):
+    """Import the app IMPORT_RUNS times, one fresh interpreter after another.
+
+    Latencies are import times and peak RSS is the largest child's, so a
+    regression means workers start slower or bigger.
+    """
+    latencies = []
+    peaks = []
+    errors = 0
+    start = time.perf_counter()
+    for _ in range(IMPORT_RUNS):
+        result = subprocess.run([sys.executable, '-c', IMPORT_PROBE], cwd=REPO_ROOT,
+                                capture_output=True, text=True)
+        try:
+            elapsed, peak = map(float, result.stdout.split()[-2:])
+        except ValueError:
+            print(f"Error importing app: {result.stderr.strip()[-500:]}")
+            errors += 1
+            continue
+        latencies.append(elapsed)
+        peaks.append(peak)
+    summary = summarize(latencies, time.perf_counter() - start, errors)
+    summary['peak_rss_mb'] = round(max(peaks, default=0.0), 1)
+    return summary
+
+
+SCENARIOS = {
+    'convert_function': scenario_convert_function,
+    'convert_flask': scenario_convert_flask,
+    'convert_asgi': scenario_convert_asgi,
+    'chat_flask': scenario_chat_flask,
+    'chat_asgi': scenario_chat_asgi,
+    'create_pdf': scenario_create_pdf,
+    'app_import': scenario_app_import
+}
+
+
+def compare(name, result, baseline, tolerance):
+    """Return a list of regressions of result against baseline."""
+    problems = []
+    if result['rps'] < baseline['rps'] * (1 - tolerance):
+        problems.append(f"{name}: {result['rps']} req/s, baseline {baseline['rps']}")
+    for key in ('p95_ms', 'p99_ms'):
+        # Ignore sub-millisecond noise
+        if result[key] > max(baseline[key] * (1 + tolerance), baseline[key] + 1):
+            problems.append(f"{name}: {key} {result[key]}, baseline {baseline[key]}")
+    if result['peak_rss_mb'] > baseline['peak_rss_mb'] * (1 + tolerance):
+        problems.append(f"{name}: peak RSS {result['peak_rss_mb']} MB, baseline {baseline['peak_rss_mb']}")
+    if result['errors'] > baseline.get('errors', 0):
+        problems.append(f"{name}: {result['errors']} errors, baseline {baseline.get('errors', 0)}")
+    return problems
+
+
+def run_scenario(name, args, settings):
+    """Run one scenario in this process and return its result."""
+    fakes.install(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    import app as app_module
+    # Let startup tasks finish so they don't compete with the scenario
+    app_module.startup.wait(60)
+    # Fresh texts per scenario so results don't depend on which ran before
+    texts = make_texts(args.requests, settings['distinct'], seed=zlib.crc32(name.encode()))
+    return SCENARIOS[name](app_module, texts, args.concurrency)
+
+
+def run_in_child(name, argv):
+    """Run one scenario in a fresh interpreter and return its result."""
+    result = subprocess.run([sys.executable, '-m', 'benchmarks.run', *argv, '--child', name],
+                            cwd=REPO_ROOT, stdout=subprocess.PIPE, text=True)
+    lines = result.stdout.splitlines()
+    # The child's own output comes first and its result last
+    for line in lines[:-1]:
+        print(line)
+    try:
+        return json.loads(lines[-1])
+    except (IndexError, ValueError):
+        raise RuntimeError(f"Scenario {name} exited with status {result.returncode}") from None
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='Scenario to run (repeatable); all by default')
+    parser.add_argument('--requests', type=int, default=500, help='Requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--distinct', type=int, default=None,
+                        help='Distinct input texts; defaults to one per request (no cache hits)')
+    parser.add_argument('--latency', type=float, default=0.2, help='Fake Gemini latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.05)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--save-baseline', action='store_true', help='Store the results as baselines')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed fractional regression against the baseline')
+    parser.add_argument('--baselines', type=Path, default=BASELINES_PATH)
+    parser.add_argument('--child', choices=sorted(SCENARIOS), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    settings = {
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'distinct': args.distinct or args.requests,
+        'latency': args.latency,
+        'jitter': args.jitter,
+        'error_rate': args.error_rate
+    }
+    if args.child:
+        result = run_scenario(args.child, args, settings)
+        print(json.dumps(result), flush=True)
+        # Skip waiting on the app's background threads and pools
+        os._exit(0)
+
+    baselines = json.loads(args.baselines.read_text()) if args.baselines.exists() else {}
+    problems = []
+    results = {}
+
+    for name in args.scenario or list(SCENARIOS):
+        result = run_in_child(name, argv)
+        results[name] = dict(result, settings=settings)
+        print(f"{name:18} {result['rps']:>8} req/s  p50 {result['p50_ms']:>7} ms  "
+              f"p95 {result['p95_ms']:>7} ms  p99 {result['p99_ms']:>7} ms  "
+              f"peak RSS {result['peak_rss_mb']:>6} MB  errors {result['errors']}")
+
+        baseline = baselines.get(name)
+        if baseline and not args.save_baseline:
+            if baseline.get('settings') != settings:
+                print(f"  (baseline for {name} was recorded with different settings; not compared)")
+            else:
+                problems.extend(compare(name, result, baseline, args.tolerance))
+
+    if args.save_baseline:
+        baselines.update(results)
+        args.baselines.write_text(json.dumps(baselines, indent=2, sort_keys=True) + '\n')
+        print(f"Saved baselines to {args.baselines}")
+        return 0
+
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,36 @@
+"""One-off database setup, run before starting the app and after upgrades:
+
+    python -m config.bootstrap
+
+Creates the indexes the app relies on, including the unique ones that
+keep duplicate contributions and migrated files from being stored twice.
+Creating an index that already exists does nothing, so it is safe to run
+again. The app itself never creates indexes, so workers start without
+waiting for the database.
+"""
+import argparse
+import sys
+import time
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Create the MongoDB indexes the app needs.')
+    parser.add_argument('--wait', type=float, default=60,
+                        help='Seconds to wait for the database to come up')
+    args = parser.parse_args(argv)
+
+    from config.database import ensure_indexes, ping
+    deadline = time.monotonic() + args.wait
+    while not ping():
+        if time.monotonic() >= deadline:
+            print('Database is not reachable')
+            return 1
+        time.sleep(1)
+
+    ensure_indexes()
+    print('Indexes are up to date')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,18 +1,60 @@
+import pymongo
 from pymongo import MongoClient
 from dotenv import load_dotenv
 import os
 
 load_dotenv()
 
-# MongoDB connection
-client = MongoClient(os.getenv('MONGODB_URI', 'mongodb://localhost:27017/'))
+# MongoDB connection. The client connects in the background on first use,
+# so importing this module never waits for the database; operations give up
+# after MONGODB_TIMEOUT_MS if no server can be reached.
+client = MongoClient(
+    os.getenv('MONGODB_URI', 'mongodb://localhost:27017/'),
+    serverSelectionTimeoutMS=int(os.getenv('MONGODB_TIMEOUT_MS', 5000))
+)
 db = client['banglish_converter']
 users = db['users']
+contributions = db['contributions']
+translation_cache = db['translation_cache']
+analytics = db['analytics']
 
-# Create indexes
-users.create_index('email', unique=True)
-users.create_index('username', unique=True)
 
-# Create contributions collection
-contributions = db['contributions']
-contributions.create_index([('status', 1), ('submitted_at', -1)]) 
\ No newline at end of file
+def ping(timeout_ms=None):
+    """Return True if the database answers, waiting at most timeout_ms
+    (default: the client's server selection timeout)."""
+    try:
+        if timeout_ms is None:
+            client.admin.command('ping')
+        else:
+            with pymongo.timeout(timeout_ms / 1000):
+                client.admin.command('ping')
+        return True
+    except Exception:
+        return False
+
+
+def ensure_indexes():
+    """Create every index the app relies on; run by `python -m config.bootstrap`."""
+    users.create_index('email', unique=True)
+    users.create_index('username', unique=True)
+
+    # Contribution lists page by (submitted_at, _id), optionally filtered by
+    # status or user, so each filter has an index in that order
+    contributions.create_index([('status', 1), ('submitted_at', -1), ('_id', -1)])
+    contributions.create_index([('user_id', 1), ('submitted_at', -1), ('_id', -1)])
+    contributions.create_index([('submitted_at', -1), ('_id', -1)])
+    # Contributions imported from the old JSON files remember their file name
+    contributions.create_index(
+        'source_file', unique=True, partialFilterExpression={'source_file': {'$exists': True}}
+    )
+    # Exact duplicates (after normalization) share a content hash; older
+    # contributions without one are left out of the index
+    contributions.create_index(
+        'content_hash', unique=True, partialFilterExpression={'content_hash': {'$exists': True}}
+    )
+    # Mongo drops translation cache entries once they expire
+    translation_cache.create_index('expires_at', expireAfterSeconds=0)
+    translation_cache.create_index('words')
+    # Analytics holds hourly, daily and all-time counters; hourly buckets
+    # carry an expiry so Mongo drops them after a while
+    analytics.create_index('expires_at', expireAfterSeconds=0)
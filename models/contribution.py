@@ -1,6 +1,59 @@
 from datetime import datetime
 from config.database import db
 from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import DuplicateKeyError
+from services.contribution_dedup import content_hash
+import base64
+
+# Fields shown in contribution lists; everything else stays in the database
+LIST_FIELDS = {
+    'banglish': 1, 'bengali': 1, 'feedback': 1, 'status': 1, 'submitted_at': 1, 'user_id': 1,
+    'votes': 1
+}
+
+# Bulk reviews look up and update at most this many contributions per query
+REVIEW_BATCH_SIZE = 1000
+
+# Callbacks run with a list of contributions once they have been approved
+# or rejected
+_approval_listeners = []
+_rejection_listeners = []
+
+def _notify(listeners, contributions):
+    for callback in listeners:
+        try:
+            callback(contributions)
+        except Exception as e:
+            print(f"Error in review listener {callback}: {e}")
+
+def _notify_approved(contributions):
+    _notify(_approval_listeners, contributions)
+
+def _notify_rejected(contributions):
+    _notify(_rejection_listeners, contributions)
+
+def encode_cursor(submitted_at, contribution_id):
+    """Return an opaque page cursor for the position after a contribution."""
+    raw = f"{submitted_at.isoformat()}|{contribution_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    """Return (submitted_at, ObjectId) from a cursor; raises ValueError if it's malformed."""
+    try:
+        submitted_at, contribution_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+        return datetime.fromisoformat(submitted_at), ObjectId(contribution_id)
+    except (ValueError, UnicodeError, InvalidId) as e:
+        raise ValueError('Invalid page cursor') from e
+
+def _review_fields(status, reviewer_id, comment, reviewed_at):
+    """Return the $set for a review; the rest of the document is left alone."""
+    return {
+        'status': status,
+        'reviewed_at': reviewed_at,
+        'reviewer_id': reviewer_id,
+        'reviewer_comment': comment
+    }
 
 class Contribution:
     def __init__(self, banglish, bengali, user_id, feedback=None, _id=None):
@@ -13,6 +66,9 @@ class Contribution:
         self.reviewed_at = None
         self.reviewer_id = None
         self.reviewer_comment = None
+        # Later submissions of the same pair add votes instead of new records
+        self.votes = 1
+        self.content_hash = content_hash(banglish, bengali)
         self._id = _id
 
     def save(self):
@@ -25,7 +81,9 @@ class Contribution:
             'submitted_at': self.submitted_at,
             'reviewed_at': self.reviewed_at,
             'reviewer_id': self.reviewer_id,
-            'reviewer_comment': self.reviewer_comment
+            'reviewer_comment': self.reviewer_comment,
+            'votes': self.votes,
+            'content_hash': self.content_hash
         }
         
         if self._id:
@@ -39,40 +97,202 @@ class Contribution:
         
         return self
 
+    def save_or_vote(self):
+        """Insert a new contribution, or vote for the stored one with the same content.
+
+        Returns True if the contribution was inserted. Either way _id is
+        the stored contribution's id afterwards.
+        """
+        try:
+            self.save()
+            return True
+        except DuplicateKeyError:
+            existing = db.contributions.find_one_and_update(
+                {'content_hash': self.content_hash},
+                {'$inc': {'votes': 1}},
+                projection={'_id': 1}
+            )
+            if existing is None:
+                raise
+            self._id = str(existing['_id'])
+            return False
+
     @staticmethod
-    def get_pending_contributions():
-        contributions = db.contributions.find({'status': 'pending'})
-        return [Contribution(
+    def add_vote(contribution_id):
+        """Count another submission of an existing contribution."""
+        db.contributions.update_one({'_id': ObjectId(contribution_id)}, {'$inc': {'votes': 1}})
+
+    @staticmethod
+    def _from_document(c):
+        contribution = Contribution(
             banglish=c['banglish'],
             bengali=c['bengali'],
-            user_id=c['user_id'],
+            user_id=c.get('user_id'),
             feedback=c.get('feedback'),
             _id=str(c['_id'])
-        ) for c in contributions]
+        )
+        contribution.status = c.get('status', 'pending')
+        contribution.submitted_at = c.get('submitted_at')
+        contribution.votes = c.get('votes', 1)
+        return contribution
+
+    @staticmethod
+    def list_page(status=None, user_id=None, cursor=None, limit=20, newest_first=True):
+        """Return (contributions, next_cursor) for one page of contributions.
+
+        Pages are keyed on (submitted_at, _id), so each page is a single
+        index range scan however deep into the list it is. next_cursor is
+        None on the last page.
+        """
+        query = {}
+        if status:
+            query['status'] = status
+        if user_id:
+            query['user_id'] = user_id
+        if cursor:
+            submitted_at, last_id = decode_cursor(cursor)
+            beyond = '$lt' if newest_first else '$gt'
+            query['$or'] = [
+                {'submitted_at': {beyond: submitted_at}},
+                {'submitted_at': submitted_at, '_id': {beyond: last_id}}
+            ]
+
+        direction = -1 if newest_first else 1
+        documents = list(
+            db.contributions.find(query, LIST_FIELDS)
+            .sort([('submitted_at', direction), ('_id', direction)])
+            .limit(limit + 1)
+        )
+        next_cursor = None
+        if len(documents) > limit:
+            last = documents[limit - 1]
+            next_cursor = encode_cursor(last['submitted_at'], last['_id'])
+        return [Contribution._from_document(c) for c in documents[:limit]], next_cursor
+
+    @staticmethod
+    def get_examples(limit=None):
+        """Return the newest non-rejected contributions as dicts, oldest first."""
+        cursor = db.contributions.find(
+            {'status': {'$ne': 'rejected'}},
+            {'banglish': 1, 'bengali': 1, 'feedback': 1, '_id': 0}
+        ).sort([('submitted_at', -1), ('_id', -1)])
+        if limit:
+            cursor = cursor.limit(limit)
+        return list(cursor)[::-1]
+
+    @staticmethod
+    def get_pending_contributions(cursor=None, limit=20):
+        """Return (contributions, next_cursor) for the review queue, oldest first."""
+        return Contribution.list_page(status='pending', cursor=cursor, limit=limit, newest_first=False)
+
+    @staticmethod
+    def get_approved_pairs():
+        """Yield (banglish, bengali) for every approved contribution."""
+        for c in db.contributions.find({'status': 'approved'}, {'banglish': 1, 'bengali': 1, '_id': 0}):
+            yield c['banglish'], c['bengali']
+
+    @staticmethod
+    def get_all_pairs():
+        """Yield (id, banglish, bengali) for every contribution."""
+        for c in db.contributions.find({}, {'banglish': 1, 'bengali': 1}):
+            yield str(c['_id']), c['banglish'], c['bengali']
 
     @staticmethod
     def get_by_id(contribution_id):
         c = db.contributions.find_one({'_id': ObjectId(contribution_id)})
         if c:
-            return Contribution(
-                banglish=c['banglish'],
-                bengali=c['bengali'],
-                user_id=c['user_id'],
-                feedback=c.get('feedback'),
-                _id=str(c['_id'])
-            )
+            return Contribution._from_document(c)
         return None
 
-    def approve(self, reviewer_id, comment=None):
-        self.status = 'approved'
+    @staticmethod
+    def add_approval_listener(callback):
+        """Register callback(contributions) to run after approvals."""
+        _approval_listeners.append(callback)
+
+    @staticmethod
+    def add_rejection_listener(callback):
+        """Register callback(contributions) to run after rejections."""
+        _rejection_listeners.append(callback)
+
+    @staticmethod
+    def review_many(contribution_ids, status, reviewer_id, comment=None):
+        """Set the review status of many contributions at once.
+
+        Returns one {'contribution_id', 'result'} per id, in order, where
+        result is the new status, 'unchanged' if it already had it,
+        'not_found' or 'invalid_id'. Each batch is one find and one
+        update_many, and approval or rejection listeners run once for the
+        whole call.
+        """
+        results = {}
+        object_ids = {}
+        for contribution_id in contribution_ids:
+            # ObjectId(None) would make up a new id, so only strings count
+            if isinstance(contribution_id, str) and ObjectId.is_valid(contribution_id):
+                object_ids[ObjectId(contribution_id)] = contribution_id
+
+        reviewed_at = datetime.now()
+        fields = _review_fields(status, reviewer_id, comment, reviewed_at)
+        changed = []
+        ids = list(object_ids)
+        for start in range(0, len(ids), REVIEW_BATCH_SIZE):
+            batch = ids[start:start + REVIEW_BATCH_SIZE]
+            documents = {
+                c['_id']: c for c in db.contributions.find(
+                    {'_id': {'$in': batch}},
+                    {'banglish': 1, 'bengali': 1, 'feedback': 1, 'user_id': 1, 'status': 1}
+                )
+            }
+            pending = [c for c in documents.values() if c.get('status') != status]
+            if pending:
+                db.contributions.update_many(
+                    {'_id': {'$in': [c['_id'] for c in pending]}, 'status': {'$ne': status}},
+                    {'$set': fields}
+                )
+                changed.extend(pending)
+            for object_id in batch:
+                c = documents.get(object_id)
+                if c is None:
+                    result = 'not_found'
+                else:
+                    result = 'unchanged' if c.get('status') == status else status
+                results[object_ids[object_id]] = result
+
+        if status == 'approved' and changed:
+            _notify_approved([Contribution._from_document(c) for c in changed])
+        elif status == 'rejected' and changed:
+            _notify_rejected([Contribution._from_document(c) for c in changed])
+        return [
+            {
+                'contribution_id': contribution_id,
+                'result': results.get(contribution_id, 'invalid_id')
+                if isinstance(contribution_id, str) else 'invalid_id'
+            }
+            for contribution_id in contribution_ids
+        ]
+
+    @staticmethod
+    def approve_many(contribution_ids, reviewer_id, comment=None):
+        return Contribution.review_many(contribution_ids, 'approved', reviewer_id, comment)
+
+    @staticmethod
+    def reject_many(contribution_ids, reviewer_id, comment=None):
+        return Contribution.review_many(contribution_ids, 'rejected', reviewer_id, comment)
+
+    def _review(self, status, reviewer_id, comment):
+        self.status = status
         self.reviewed_at = datetime.now()
         self.reviewer_id = reviewer_id
         self.reviewer_comment = comment
-        self.save()
+        db.contributions.update_one(
+            {'_id': ObjectId(self._id)},
+            {'$set': _review_fields(status, reviewer_id, comment, self.reviewed_at)}
+        )
+
+    def approve(self, reviewer_id, comment=None):
+        self._review('approved', reviewer_id, comment)
+        _notify_approved([self])
 
     def reject(self, reviewer_id, comment=None):
-        self.status = 'rejected'
-        self.reviewed_at = datetime.now()
-        self.reviewer_id = reviewer_id
-        self.reviewer_comment = comment
-        self.save() 
\ No newline at end of file
+        self._review('rejected', reviewer_id, comment)
+        _notify_rejected([self])
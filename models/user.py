@@ -1,7 +1,28 @@
 from flask_login import UserMixin
 from bson.objectid import ObjectId
 from config.database import users
-import bcrypt
+from services.password_hashing import PasswordHasher
+import asyncio
+import copy
+import os
+import threading
+import time
+
+# Users loaded for a session are reused for USER_CACHE_TTL seconds instead
+# of querying MongoDB on every request. Changes made through this class
+# invalidate the entry at once; other workers see them within the TTL.
+USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', 30))
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 10000))
+_user_cache = {}  # user id -> (User, expires_at)
+_user_cache_lock = threading.Lock()
+
+# bcrypt runs on BCRYPT_WORKERS threads at cost BCRYPT_ROUNDS; once
+# BCRYPT_MAX_QUEUE more are waiting, further requests raise HasherBusy
+password_hasher = PasswordHasher(
+    rounds=int(os.getenv('BCRYPT_ROUNDS', 12)),
+    max_workers=int(os.getenv('BCRYPT_WORKERS', 2)),
+    max_queue=int(os.getenv('BCRYPT_MAX_QUEUE', 16))
+)
 
 class User(UserMixin):
     def __init__(self, username, email, password=None, _id=None):
@@ -26,25 +47,78 @@ class User(UserMixin):
 
     @staticmethod
     def get_by_id(user_id):
-        user_data = users.find_one({'_id': ObjectId(user_id)})
+        user_data = users.find_one(
+            {'_id': ObjectId(user_id)},
+            {'username': 1, 'email': 1, 'role': 1}
+        )
         if user_data:
-            return User(
+            user = User(
                 username=user_data['username'],
                 email=user_data['email'],
                 _id=str(user_data['_id'])
             )
+            user.role = user_data.get('role', 'user')
+            return user
         return None
 
+    @staticmethod
+    def get_cached(user_id):
+        """Like get_by_id, but served from the short-lived user cache when possible."""
+        now = time.monotonic()
+        with _user_cache_lock:
+            entry = _user_cache.get(user_id)
+        if entry is not None and entry[1] > now:
+            # Each request gets its own copy to modify
+            return copy.copy(entry[0])
+
+        user = User.get_by_id(user_id)
+        if user is not None and USER_CACHE_TTL > 0:
+            with _user_cache_lock:
+                if len(_user_cache) >= USER_CACHE_SIZE:
+                    expired = [key for key, (_, expires_at) in _user_cache.items() if expires_at <= now]
+                    for key in expired or list(_user_cache)[:len(_user_cache) // 10 + 1]:
+                        del _user_cache[key]
+                _user_cache[user_id] = (copy.copy(user), now + USER_CACHE_TTL)
+        return user
+
+    @staticmethod
+    def invalidate(user_id):
+        """Drop a user from the cache after their document changes."""
+        with _user_cache_lock:
+            _user_cache.pop(str(user_id), None)
+
+    def update_profile(self, **fields):
+        """Update the username and/or email."""
+        changes = {key: value for key, value in fields.items() if key in ('username', 'email')}
+        if not changes:
+            return self
+        users.update_one({'_id': ObjectId(self._id)}, {'$set': changes})
+        for key, value in changes.items():
+            setattr(self, key, value)
+        User.invalidate(self._id)
+        return self
+
+    def set_role(self, role):
+        users.update_one({'_id': ObjectId(self._id)}, {'$set': {'role': role}})
+        self.role = role
+        User.invalidate(self._id)
+        return self
+
     @staticmethod
     def get_by_email(email):
-        user_data = users.find_one({'email': email})
+        user_data = users.find_one(
+            {'email': email},
+            {'username': 1, 'email': 1, 'password': 1, 'role': 1}
+        )
         if user_data:
-            return User(
+            user = User(
                 username=user_data['username'],
                 email=user_data['email'],
                 password=user_data['password'],
                 _id=str(user_data['_id'])
             )
+            user.role = user_data.get('role', 'user')
+            return user
         return None
 
     def get_id(self):
@@ -55,13 +129,22 @@ class User(UserMixin):
             raise ValueError("Password is required")
             
         # Hash password
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(self.password.encode('utf-8'), salt)
-        
+        return self._insert(password_hasher.hash(self.password))
+
+    async def save_async(self):
+        """Like save, for the async routes: the hash is awaited and the
+        insert runs off the event loop."""
+        if not self.password:
+            raise ValueError("Password is required")
+        hashed = await password_hasher.hash_async(self.password)
+        return await asyncio.to_thread(self._insert, hashed)
+
+    def _insert(self, hashed):
         user_data = {
             'username': self.username,
             'email': self.email,
-            'password': hashed
+            'password': hashed,
+            'role': self.role
         }
         
         result = users.insert_one(user_data)
@@ -71,9 +154,13 @@ class User(UserMixin):
     @staticmethod
     def check_password(email, password):
         user = User.get_by_email(email)
-        if user and bcrypt.checkpw(
-            password.encode('utf-8'), 
-            user.password
-        ):
+        if user and password_hasher.check(password, user.password):
+            return user
+        return None
+
+    @staticmethod
+    async def check_password_async(email, password):
+        user = await asyncio.to_thread(User.get_by_email, email)
+        if user and await password_hasher.check_async(password, user.password):
             return user
         return None 
\ No newline at end of file
@@ -0,0 +1,91 @@
+"""Analytics ingestion off the request path.
+
+Request handlers only append an event to a bounded deque, which is safe
+without a lock in CPython. A background thread drains the deque and hands
+the events to the AnalyticsStore in batches, where the tokenizing and
+counting happen. When the deque is full, events are dropped and counted
+rather than slowing the request: 'drop_newest' discards the incoming
+event and 'drop_oldest' makes room by discarding the oldest queued one.
+"""
+import atexit
+import threading
+from collections import deque
+from datetime import datetime
+
+OVERFLOW_POLICIES = ('drop_newest', 'drop_oldest')
+
+
+class AnalyticsQueue:
+    def __init__(self, store, maxsize=10000, overflow='drop_newest', batch_size=500, interval=0.5):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown analytics overflow policy: {overflow}")
+        self.store = store
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.batch_size = batch_size
+        self.interval = interval
+        # drop_oldest lets the deque discard from the left by itself
+        self._events = deque(maxlen=maxsize if overflow == 'drop_oldest' else None)
+        self._stopped = threading.Event()
+        self._thread = None
+        self.enqueued = 0
+        self.dropped = 0
+        self.processed = 0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        self._stopped.set()
+        self.drain()
+
+    def record_translation(self, bengali_text, banglish_text=None, font=None):
+        self._put('translation', (bengali_text, banglish_text, font))
+
+    def record_failure(self):
+        self._put('failure', ())
+
+    def record_font(self, font):
+        self._put('font', (font,))
+
+    def record_contribution(self):
+        self._put('contribution', ())
+
+    def _put(self, name, args):
+        if len(self._events) >= self.maxsize:
+            self.dropped += 1
+            if self.overflow == 'drop_newest':
+                return
+        self._events.append((name, datetime.now(), args))
+        self.enqueued += 1
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.drain()
+
+    def drain(self):
+        """Hand every queued event to the store, batch_size at a time."""
+        while self._events:
+            batch = []
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self._events.popleft())
+            except IndexError:
+                pass
+            try:
+                self.store.record_events(batch)
+            except Exception as e:
+                print(f"Error recording analytics: {e}")
+            self.processed += len(batch)
+
+    def stats(self):
+        return {
+            'queued': len(self._events),
+            'enqueued': self.enqueued,
+            'dropped': self.dropped,
+            'processed': self.processed
+        }
@@ -0,0 +1,292 @@
+"""Pre-aggregated usage analytics.
+
+Events are folded into running counters per bucket instead of being kept
+as raw lists: one all-time document, one per day and one per hour. Each
+worker accumulates its increments in memory and flushes them as a batch
+of upserts every flush_interval seconds, so counters from every worker
+end up in the same documents. Reading a summary touches the all-time
+document and one document per day shown, however long the history is.
+
+Word frequencies are kept as a bounded Space-Saving summary per bucket.
+Workers merge their pending summaries into the stored ones on flush, and
+windowed top words come from merging the hourly or daily summaries.
+
+Without a collection the buckets live in process memory instead.
+"""
+import atexit
+import re
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from services.heavy_hitters import SpaceSaving
+
+_WORD_RE = re.compile(r'\w+')
+
+# Hourly buckets are only useful for recent windows; Mongo drops them later
+HOUR_BUCKET_DAYS = 30
+
+
+def _bucket_ids(now):
+    return {
+        'total': ('total', None),
+        f"day:{now:%Y-%m-%d}": ('day', datetime(now.year, now.month, now.day)),
+        f"hour:{now:%Y-%m-%dT%H}": ('hour', datetime(now.year, now.month, now.day, now.hour))
+    }
+
+
+class AnalyticsStore:
+    def __init__(self, collection=None, flush_interval=10, word_capacity=1000):
+        self.collection = collection
+        self.flush_interval = flush_interval
+        self.word_capacity = word_capacity
+        self._pending = defaultdict(Counter)  # bucket id -> field -> increment
+        self._pending_words = {}  # bucket id -> SpaceSaving
+        self._buckets = {}  # bucket id -> (kind, start)
+        self._docs = {}  # in-memory buckets when there is no collection
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Flush pending counters in the background until the process exits."""
+        if self.collection is None or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        self._stopped.set()
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+
+    def record_translation(self, bengali_text, banglish_text=None, font=None, now=None):
+        self.record_events([('translation', now or datetime.now(), (bengali_text, banglish_text, font))])
+
+    def record_failure(self, now=None):
+        self.record_events([('failure', now or datetime.now(), ())])
+
+    def record_font(self, font, now=None):
+        self.record_events([('font', now or datetime.now(), (font,))])
+
+    def record_contribution(self, now=None):
+        self.record_events([('contribution', now or datetime.now(), ())])
+
+    def record_events(self, events):
+        """Aggregate a batch of (name, time, args) events."""
+        groups = {}  # hour -> (bucket increments, all-time increments, word counts)
+        for name, now, args in events:
+            hour = now.replace(minute=0, second=0, microsecond=0)
+            fields, total, words = groups.setdefault(hour, (Counter(), Counter(), Counter()))
+            if name == 'translation':
+                bengali_text, banglish_text, font = args
+                fields['documents'] += 1
+                fields['words'] += len(bengali_text.split())
+                fields['chars'] += len(bengali_text)
+                fields['successes'] += 1
+                total[f"hours.{now.hour}"] += 1
+                if font:
+                    total[f"fonts.{font}"] += 1
+                if banglish_text:
+                    words.update(_WORD_RE.findall(banglish_text.lower()))
+            elif name == 'failure':
+                fields['failures'] += 1
+            elif name == 'font':
+                total[f"fonts.{args[0]}"] += 1
+            elif name == 'contribution':
+                fields['contributions'] += 1
+
+        with self._lock:
+            for hour, (fields, total, words) in groups.items():
+                self._add(hour, fields, total, words)
+        if self.collection is None:
+            self.flush()
+
+    def _add(self, hour, fields, total_only, words):
+        if fields:
+            for bucket_id, bucket in _bucket_ids(hour).items():
+                self._buckets[bucket_id] = bucket
+                self._pending[bucket_id].update(fields)
+                if words:
+                    summary = self._pending_words.get(bucket_id)
+                    if summary is None:
+                        summary = self._pending_words[bucket_id] = SpaceSaving(self.word_capacity)
+                    for word, count in words.items():
+                        summary.add(word, count)
+        if total_only:
+            self._buckets['total'] = ('total', None)
+            self._pending['total'].update(total_only)
+
+    def flush(self):
+        """Write the pending increments to the store."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, defaultdict(Counter)
+                pending_words, self._pending_words = self._pending_words, {}
+                buckets = {bucket_id: self._buckets.pop(bucket_id) for bucket_id in pending}
+            if not pending:
+                return
+
+            if self.collection is None:
+                for bucket_id, increments in pending.items():
+                    doc = self._docs.setdefault(bucket_id, {})
+                    for field, value in increments.items():
+                        _inc_field(doc, field, value)
+                for bucket_id, summary in pending_words.items():
+                    doc = self._docs[bucket_id]
+                    doc['top_words'] = self._merge_words(doc.get('top_words'), summary)
+                return
+
+            requests = []
+            request_buckets = []  # request index -> bucket id
+            for bucket_id, increments in pending.items():
+                kind, start = buckets[bucket_id]
+                on_insert = {'kind': kind, 'start': start}
+                if kind == 'hour':
+                    on_insert['expires_at'] = start + timedelta(days=HOUR_BUCKET_DAYS)
+                requests.append(UpdateOne(
+                    {'_id': bucket_id},
+                    {'$inc': dict(increments), '$setOnInsert': on_insert},
+                    upsert=True
+                ))
+                request_buckets.append(bucket_id)
+            try:
+                self.collection.bulk_write(requests, ordered=False)
+            except BulkWriteError as e:
+                # The writes are unordered, so every upsert not listed as
+                # failed went through; retrying those would count them twice
+                print(f"Error flushing analytics: {e}")
+                failed = [request_buckets[error['index']] for error in e.details.get('writeErrors', [])]
+                with self._lock:
+                    self._requeue({bucket_id: pending[bucket_id] for bucket_id in failed}, buckets)
+            except Exception as e:
+                print(f"Error flushing analytics: {e}")
+                # Keep the increments for the next flush
+                with self._lock:
+                    self._requeue(pending, buckets)
+                    for bucket_id, summary in pending_words.items():
+                        self._requeue_words(bucket_id, summary)
+                return
+
+            for bucket_id, summary in pending_words.items():
+                try:
+                    self._store_words(bucket_id, summary)
+                except Exception as e:
+                    print(f"Error flushing analytics words: {e}")
+                    with self._lock:
+                        self._requeue_words(bucket_id, summary)
+
+    def _merge_words(self, entries, summary):
+        return SpaceSaving.from_entries(entries, self.word_capacity).merge(summary.entries()).entries()
+
+    def _store_words(self, bucket_id, summary, attempts=5):
+        """Merge a pending summary into the stored one, retrying on conflicts."""
+        for _ in range(attempts):
+            doc = self.collection.find_one({'_id': bucket_id}, {'top_words': 1, 'words_version': 1}) or {}
+            version = doc.get('words_version')
+            result = self.collection.update_one(
+                {'_id': bucket_id, 'words_version': version},
+                {
+                    '$set': {'top_words': self._merge_words(doc.get('top_words'), summary)},
+                    '$inc': {'words_version': 1}
+                }
+            )
+            if result.modified_count:
+                return
+        raise RuntimeError(f"Too many concurrent updates to {bucket_id}")
+
+    def _requeue(self, pending, buckets):
+        for bucket_id, increments in pending.items():
+            self._buckets.setdefault(bucket_id, buckets[bucket_id])
+            self._pending[bucket_id].update(increments)
+
+    def _requeue_words(self, bucket_id, summary):
+        current = self._pending_words.get(bucket_id)
+        if current is not None:
+            summary.merge(current.entries())
+        self._pending_words[bucket_id] = summary
+
+    def _read(self, bucket_ids):
+        """Return {bucket id: document} including this worker's unflushed counts."""
+        if self.collection is None:
+            self.flush()
+            return {bucket_id: self._docs[bucket_id] for bucket_id in bucket_ids if bucket_id in self._docs}
+
+        try:
+            docs = {doc['_id']: doc for doc in self.collection.find({'_id': {'$in': list(bucket_ids)}})}
+        except Exception as e:
+            print(f"Error reading analytics: {e}")
+            docs = {}
+        with self._lock:
+            for bucket_id in bucket_ids:
+                increments = self._pending.get(bucket_id)
+                if increments:
+                    doc = docs.setdefault(bucket_id, {})
+                    for field, value in increments.items():
+                        _inc_field(doc, field, value)
+                summary = self._pending_words.get(bucket_id)
+                if summary:
+                    doc = docs.setdefault(bucket_id, {})
+                    doc['top_words'] = self._merge_words(doc.get('top_words'), summary)
+        return docs
+
+    def _top_words(self, docs, k):
+        """Return the top k words across the documents' summaries."""
+        entries = [entry for doc in docs for entry in doc.get('top_words') or []]
+        return dict(SpaceSaving.from_entries(entries, self.word_capacity).top(k))
+
+    def summary(self, days=7, now=None):
+        """Return the all-time totals plus per-day counts for the last days."""
+        now = now or datetime.now()
+        today = now.date()
+        dates = [today - timedelta(days=i) for i in range(days - 1, -1, -1)]
+        day_ids = [f"day:{date:%Y-%m-%d}" for date in dates]
+        week_ids = [f"day:{today - timedelta(days=i):%Y-%m-%d}" for i in range(7)]
+        hour_ids = [f"hour:{now - timedelta(hours=i):%Y-%m-%dT%H}" for i in range(24)]
+        docs = self._read(list(dict.fromkeys(['total'] + day_ids + week_ids + hour_ids)))
+
+        total = docs.get('total', {})
+        documents = total.get('documents', 0)
+        outcomes = total.get('successes', 0) + total.get('failures', 0)
+        hours = {int(hour): count for hour, count in total.get('hours', {}).items()}
+        window = [docs.get(day_id, {}) for day_id in day_ids]
+        window_documents = sum(doc.get('documents', 0) for doc in window)
+
+        return {
+            'total_words': total.get('words', 0),
+            'total_documents': documents,
+            'contributions': total.get('contributions', 0),
+            'avg_length': total.get('chars', 0) / documents if documents else 0,
+            'success_rate': total.get('successes', 0) / outcomes * 100 if outcomes else 0,
+            'font_usage': dict(total.get('fonts', {})),
+            'common_words': self._top_words([total], 10),
+            'common_words_24h': self._top_words([docs.get(i, {}) for i in hour_ids], 10),
+            'common_words_7d': self._top_words([docs.get(i, {}) for i in week_ids], 10),
+            'hourly_stats': hours,
+            'peak_hours': sorted(hours.items(), key=lambda x: x[1], reverse=True)[:3],
+            'daily_stats': {
+                date.isoformat(): doc.get('documents', 0) for date, doc in zip(dates, window)
+            },
+            'window_words': sum(doc.get('words', 0) for doc in window),
+            'window_documents': window_documents,
+            'window_avg_length': (
+                sum(doc.get('chars', 0) for doc in window) / window_documents
+                if window_documents else 0
+            )
+        }
+
+
+def _inc_field(doc, field, value):
+    """Apply a Mongo-style dotted $inc to a plain dict."""
+    *parents, name = field.split('.')
+    for parent in parents:
+        doc = doc.setdefault(parent, {})
+    doc[name] = doc.get(name, 0) + value
@@ -0,0 +1,150 @@
+"""Minimal native ASGI routing in front of the Flask app.
+
+Flask views run in a worker thread for their whole lifetime, which is
+wasteful for requests that mostly wait on Gemini. AsyncRoutes serves the
+registered (method, path) pairs as coroutines on the event loop and hands
+every other request to Flask through WsgiToAsgi.
+
+A handler returns either (status, payload) or (status, payload, headers),
+sent as JSON, or an async iterator of payloads, streamed to the client as
+Server-Sent Events.
+"""
+import json
+import time
+from http.cookies import SimpleCookie
+from urllib.parse import quote
+
+import flask
+import flask_login
+from asgiref.wsgi import WsgiToAsgi
+
+from services.metrics import REQUEST_SECONDS
+
+
+class AsyncRoutes:
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.routes = {}
+
+    def route(self, path, methods=('POST',)):
+        """Register an async handler(request) for path."""
+        def decorator(handler):
+            for method in methods:
+                self.routes[(method, path)] = handler
+            return handler
+        return decorator
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            handler = self.routes.get((scope['method'], scope['path']))
+            if handler is not None:
+                started = time.perf_counter()
+                try:
+                    request = AsyncRequest(self.flask_app, scope, await _read_body(receive))
+                    result = await handler(request)
+                    if hasattr(result, '__aiter__'):
+                        await send_events(send, result)
+                    else:
+                        await send_json(send, *result)
+                finally:
+                    REQUEST_SECONDS.observe(time.perf_counter() - started, scope['path'], scope['method'])
+                return
+        await self.wsgi(scope, receive, send)
+
+
+class AsyncRequest:
+    def __init__(self, flask_app, scope, body):
+        self.flask_app = flask_app
+        self.scope = scope
+        self.path = scope['path']
+        self.body = body
+        self.headers = {
+            name.decode('latin-1').lower(): value.decode('latin-1')
+            for name, value in scope.get('headers', [])
+        }
+        self._session = None
+
+    def get_json(self):
+        return json.loads(self.body or b'{}')
+
+    @property
+    def session(self):
+        """Read-only view of the signed Flask session cookie."""
+        if self._session is None:
+            self._session = {}
+            cookie = SimpleCookie(self.headers.get('cookie', ''))
+            name = self.flask_app.config['SESSION_COOKIE_NAME']
+            serializer = self.flask_app.session_interface.get_signing_serializer(self.flask_app)
+            if name in cookie and serializer is not None:
+                max_age = int(self.flask_app.permanent_session_lifetime.total_seconds())
+                try:
+                    self._session = serializer.loads(cookie[name].value, max_age=max_age)
+                except Exception:
+                    pass
+        return self._session
+
+    @property
+    def user_id(self):
+        """The id Flask-Login stored for the logged-in user, if any."""
+        return self.session.get('_user_id')
+
+    def login_user(self, user):
+        """Log user in through Flask-Login and return the headers that set
+        the new session cookie, exactly as the Flask view would."""
+        headers = {name: value for name, value in self.headers.items() if name != 'content-length'}
+        client = self.scope.get('client') or ('', 0)
+        with self.flask_app.test_request_context(self.path, method=self.scope['method'], headers=headers,
+                                                 environ_base={'REMOTE_ADDR': client[0]}):
+            flask_login.login_user(user)
+            response = self.flask_app.response_class()
+            self.flask_app.session_interface.save_session(self.flask_app, flask.session, response)
+        self._session = None
+        return [('Set-Cookie', cookie) for cookie in response.headers.getlist('Set-Cookie')]
+
+    def login_redirect(self, login_path='/login'):
+        """Mirror Flask-Login's redirect for anonymous users."""
+        return 302, {'location': f"{login_path}?next={quote(self.path)}"}
+
+
+async def _read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+async def send_json(send, status, payload, extra_headers=()):
+    headers = [(b'content-type', b'application/json')]
+    if status in (301, 302, 303, 307, 308):
+        headers.append((b'location', payload['location'].encode('latin-1')))
+    if isinstance(extra_headers, dict):
+        extra_headers = extra_headers.items()
+    headers.extend((name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in extra_headers)
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    headers.append((b'content-length', str(len(body)).encode('latin-1')))
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_events(send, events):
+    """Stream each payload from events as a Server-Sent Event."""
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream; charset=utf-8'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no')
+        ]
+    })
+    async for payload in events:
+        data = json.dumps(payload, ensure_ascii=False)
+        await send({
+            'type': 'http.response.body',
+            'body': f"data: {data}\n\n".encode('utf-8'),
+            'more_body': True
+        })
+    await send({'type': 'http.response.body', 'body': b''})
@@ -0,0 +1,85 @@
+"""Planning and assembly for bulk Banglish conversion.
+
+A BatchJob dedupes the input texts, converts what the transliterator and
+the translation cache can answer locally and packs the remaining spans
+into a few multi-item chunks. The caller sends each chunk to Gemini with
+whatever parallelism suits it and reports back with apply() or fail();
+results() then lists one result per input text, in input order.
+"""
+from services.translation_cache import normalize_text
+
+
+class BatchJob:
+    def __init__(self, texts, transliterator=None, cache=None, cache_version=None,
+                 items_per_chunk=20, chars_per_chunk=2000):
+        self.texts = texts
+        self.cache = cache
+        self.cache_version = cache_version
+        self._sources = {}  # normalized text -> first text seen with that form
+        self._drafts = {}  # normalized text -> Draft, or None when not transliterating
+        self._translations = {}  # span -> Bengali text
+        self._errors = {}  # span -> error message
+
+        pending = []
+        for text in texts:
+            key = normalize_text(text)
+            if key in self._drafts:
+                continue
+            draft = transliterator.draft(text) if transliterator is not None else None
+            self._sources[key] = text
+            self._drafts[key] = draft
+            pending.extend(draft.pending if draft is not None else [text])
+
+        spans = []
+        for span in dict.fromkeys(pending):
+            cached = cache.get('convert', span, cache_version) if cache is not None else None
+            if cached is not None:
+                self._translations[span] = cached
+            else:
+                spans.append(span)
+        self.chunks = _pack(spans, items_per_chunk, chars_per_chunk)
+
+    def apply(self, chunk, translations):
+        """Record Gemini's translations for a chunk."""
+        for span, translation in zip(chunk, translations):
+            self._translations[span] = translation
+            if self.cache is not None:
+                self.cache.set('convert', span, self.cache_version, translation)
+
+    def fail(self, chunk, error):
+        """Record that a chunk could not be converted."""
+        for span in chunk:
+            self._errors[span] = str(error)
+
+    def results(self):
+        """Return {'success', 'bengali_text' or 'error'} for each input text."""
+        converted = {}
+        for key, draft in self._drafts.items():
+            spans = draft.pending if draft is not None else [self._sources[key]]
+            failed = [self._errors[span] for span in spans if span in self._errors]
+            if failed:
+                converted[key] = {'success': False, 'error': failed[0]}
+                continue
+            translations = [self._translations[span] for span in spans]
+            bengali_text = draft.fill(translations) if draft is not None else translations[0]
+            if bengali_text is None:
+                converted[key] = {'success': False, 'error': 'Could not align converted spans'}
+            else:
+                converted[key] = {'success': True, 'bengali_text': bengali_text}
+        return [converted[normalize_text(text)] for text in self.texts]
+
+
+def _pack(spans, items_per_chunk, chars_per_chunk):
+    chunks = []
+    chunk = []
+    size = 0
+    for span in spans:
+        if chunk and (len(chunk) == items_per_chunk or size + len(span) > chars_per_chunk):
+            chunks.append(chunk)
+            chunk = []
+            size = 0
+        chunk.append(span)
+        size += len(span)
+    if chunk:
+        chunks.append(chunk)
+    return chunks
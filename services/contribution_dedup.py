@@ -0,0 +1,174 @@
+"""Duplicate detection for incoming contributions.
+
+Each Banglish/Bengali pair is normalized (Unicode NFKC, lower case,
+punctuation and zero-width characters dropped, whitespace collapsed) and
+checked twice: against an exact hash of the normalized pair, then against
+a MinHash signature of its character trigrams. Signatures are split into
+bands and indexed by band (locality-sensitive hashing), so only pairs
+sharing a whole band with the new one are compared. A lookup costs a few
+dict probes and one small NumPy comparison however many contributions
+are indexed. Only a pair with the same normalized Bengali can be a near
+duplicate: a one-letter change to the Bengali is usually a spelling
+correction, which has to be stored rather than counted as a vote.
+
+The index lives in process memory and is filled from the database at
+startup; the exact hash is also stored on each contribution so the
+database catches exact duplicates that arrive at two workers at once.
+"""
+import hashlib
+import re
+import threading
+import unicodedata
+import zlib
+
+import numpy as np
+
+_PRIME = (1 << 31) - 1
+_SPACE_RE = re.compile(r'\s+')
+SHINGLE_SIZE = 3
+
+
+class _StripTable(dict):
+    """str.translate table built on demand: punctuation and symbols become
+    spaces, format characters such as zero-width joiners are dropped."""
+
+    def __missing__(self, codepoint):
+        category = unicodedata.category(chr(codepoint))
+        value = None if category == 'Cf' else ' ' if category[0] in 'PS' else codepoint
+        self[codepoint] = value
+        return value
+
+
+_STRIP_TABLE = _StripTable()
+
+
+def normalize_text(text):
+    """Return text with case, punctuation and spacing differences removed."""
+    text = unicodedata.normalize('NFKC', text or '').lower().translate(_STRIP_TABLE)
+    return _SPACE_RE.sub(' ', text).strip()
+
+
+def _hash_normalized(banglish, bengali):
+    return hashlib.sha1(f"{banglish}\n{bengali}".encode('utf-8')).hexdigest()
+
+
+def content_hash(banglish, bengali):
+    """Return the hash two contributions share when they normalize alike."""
+    return _hash_normalized(normalize_text(banglish), normalize_text(bengali))
+
+
+def _shingles(banglish, bengali):
+    """Character trigrams of both normalized texts, tagged by field."""
+    shingles = set()
+    for prefix, text in (('b', banglish), ('n', bengali)):
+        if len(text) <= SHINGLE_SIZE:
+            shingles.add(f"{prefix}:{text}")
+        else:
+            shingles.update(f"{prefix}:{text[i:i + SHINGLE_SIZE]}" for i in range(len(text) - SHINGLE_SIZE + 1))
+    return shingles
+
+
+class MinHasher:
+    """MinHash signatures from num_perm universal hash functions."""
+
+    def __init__(self, num_perm=64, seed=1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, _PRIME, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, num_perm, dtype=np.uint64)
+
+    def signature(self, shingles):
+        """Return the signature of a set of strings as uint32s."""
+        values = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) & _PRIME for shingle in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        if not len(values):
+            return np.full(self.num_perm, _PRIME, dtype=np.uint32)
+        # a, x < 2**31 so a * x + b stays well inside 64 bits
+        hashed = (np.outer(self._a, values) + self._b[:, None]) % _PRIME
+        return hashed.min(axis=1).astype(np.uint32)
+
+
+class DedupIndex:
+    """Exact and near-duplicate lookup over contribution pairs.
+
+    Pairs with the same normalized Bengali whose estimated trigram Jaccard
+    similarity reaches threshold count as near duplicates. With the default 8 bands of 8 rows a pair
+    becomes a candidate with probability 1 - (1 - s**8)**8: about 0.9 at
+    0.85 similarity and 0.98 at 0.9, while pairs below 0.5 rarely do,
+    which keeps candidate lists short. A threshold of 1 or more turns
+    near-duplicate matching off.
+    """
+
+    def __init__(self, threshold=0.85, num_perm=64, bands=8):
+        if num_perm % bands:
+            raise ValueError('num_perm must be a multiple of bands')
+        self.threshold = threshold
+        self.bands = bands
+        self._rows = num_perm // bands
+        self._hasher = MinHasher(num_perm)
+        self._exact = {}  # content hash -> contribution id
+        self._ids = []  # row -> contribution id
+        self._bengali = []  # row -> normalized Bengali
+        self._signatures = np.empty((16, num_perm), dtype=np.uint32)
+        self._buckets = [{} for _ in range(bands)]  # band bytes -> rows
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._exact)
+
+    def _band_keys(self, signature):
+        return [signature[i * self._rows:(i + 1) * self._rows].tobytes() for i in range(self.bands)]
+
+    def find(self, banglish, bengali):
+        """Return (contribution id, 'exact' or 'near') for a duplicate, or None."""
+        banglish, bengali = normalize_text(banglish), normalize_text(bengali)
+        key = _hash_normalized(banglish, bengali)
+        with self._lock:
+            contribution_id = self._exact.get(key)
+        if contribution_id is not None:
+            return contribution_id, 'exact'
+        if self.threshold >= 1:
+            return None
+
+        signature = self._hasher.signature(_shingles(banglish, bengali))
+        with self._lock:
+            rows = set()
+            for buckets, band in zip(self._buckets, self._band_keys(signature)):
+                rows.update(row for row in buckets.get(band, ()) if self._bengali[row] == bengali)
+            if not rows:
+                return None
+            rows = np.fromiter(rows, dtype=np.int64, count=len(rows))
+            similarity = (self._signatures[rows] == signature).mean(axis=1)
+            best = int(similarity.argmax())
+            if similarity[best] >= self.threshold:
+                return self._ids[rows[best]], 'near'
+        return None
+
+    def add(self, contribution_id, banglish, bengali):
+        """Index a stored contribution."""
+        banglish, bengali = normalize_text(banglish), normalize_text(bengali)
+        key = _hash_normalized(banglish, bengali)
+        signature = None
+        if self.threshold < 1:
+            signature = self._hasher.signature(_shingles(banglish, bengali))
+        with self._lock:
+            if key in self._exact:
+                return
+            self._exact[key] = contribution_id
+            if signature is None:
+                return
+            row = len(self._ids)
+            if row == len(self._signatures):
+                self._signatures = np.concatenate([self._signatures, np.empty_like(self._signatures)])
+            self._signatures[row] = signature
+            self._ids.append(contribution_id)
+            self._bengali.append(bengali)
+            for buckets, band in zip(self._buckets, self._band_keys(signature)):
+                buckets.setdefault(band, []).append(row)
+
+    def extend(self, pairs):
+        """Index (contribution id, banglish, bengali) tuples."""
+        for contribution_id, banglish, bengali in pairs:
+            self.add(contribution_id, banglish, bengali)
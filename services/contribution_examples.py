@@ -0,0 +1,198 @@
+"""In-memory few-shot examples for the conversion prompt.
+
+Building a prompt used to glob, sort and parse the contributions directory
+on every request. RecentExamples keeps the newest contributions in a ring
+instead and re-renders the prompt section only when one is added, and
+ExampleIndex finds the contributions most similar to the text being
+converted.
+"""
+import math
+import threading
+from collections import Counter, defaultdict, deque
+
+import numpy as np
+
+
+def format_example(contribution):
+    """Render one contribution the way the conversion prompt lists it."""
+    example = f"- \"{contribution['banglish']}\" should be \"{contribution['bengali']}\""
+    # Add feedback as context if available
+    if contribution.get('feedback'):
+        example += f"\n  Context: {contribution['feedback']}"
+    return example
+
+
+class RecentExamples:
+    def __init__(self, size=10):
+        self._examples = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.rendered = ""
+
+    def __len__(self):
+        return len(self._examples)
+
+    def add(self, contribution):
+        """Add the newest contribution, pushing out the oldest."""
+        self.extend([contribution])
+
+    def extend(self, contributions):
+        """Add contributions given oldest first."""
+        with self._lock:
+            for contribution in contributions:
+                self._examples.appendleft(format_example(contribution))
+            self.rendered = "\n".join(self._examples)
+
+    def remove(self, contributions):
+        """Drop these contributions if they are among the recent ones."""
+        removed = {format_example(contribution) for contribution in contributions}
+        with self._lock:
+            kept = [example for example in self._examples if example not in removed]
+            if len(kept) == len(self._examples):
+                return
+            self._examples = deque(kept, maxlen=self._examples.maxlen)
+            self.rendered = "\n".join(self._examples)
+
+
+def estimate_tokens(text):
+    """Rough token count; about four UTF-8 bytes per token."""
+    return len(text.encode('utf-8')) // 4 + 1
+
+
+def _ngrams(text, n):
+    text = f" {' '.join(text.lower().split())} "
+    return Counter(text[i:i + n] for i in range(len(text) - n + 1))
+
+
+class _Postings:
+    """Growable parallel arrays of document ids and weights for one n-gram."""
+
+    __slots__ = ('ids', 'weights', 'size')
+
+    def __init__(self):
+        self.ids = np.empty(4, dtype=np.int32)
+        self.weights = np.empty(4, dtype=np.float32)
+        self.size = 0
+
+    def append(self, doc_id, weight):
+        if self.size == len(self.ids):
+            self.ids = np.concatenate([self.ids, np.empty_like(self.ids)])
+            self.weights = np.concatenate([self.weights, np.empty_like(self.weights)])
+        self.ids[self.size] = doc_id
+        self.weights[self.size] = weight
+        self.size += 1
+
+
+class ExampleIndex:
+    """Character n-gram TF-IDF index for picking examples similar to the input.
+
+    Documents are stored in an inverted index of NumPy posting arrays, so a
+    query only touches the n-grams it contains. Query n-grams are scored
+    rarest first until max_postings entries have been read; the common
+    n-grams left over carry little signal, and skipping them keeps a query
+    well under a millisecond however large the index grows.
+
+    Removed documents stay in the posting arrays and are skipped when
+    scoring.
+    """
+
+    def __init__(self, ngram=3, max_postings=20000):
+        self.ngram = ngram
+        self.max_postings = max_postings
+        self._postings = {}
+        self._examples = []  # rendered examples by document id
+        self._sources = []  # normalized banglish by document id
+        self._doc_ids = defaultdict(list)  # rendered example -> document ids
+        self._removed = frozenset()  # replaced, not mutated, so searches need no lock
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._examples) - len(self._removed)
+
+    def add(self, contribution):
+        self.extend([contribution])
+
+    def extend(self, contributions):
+        with self._lock:
+            for contribution in contributions:
+                self._add(contribution)
+
+    def _add(self, contribution):
+        doc_id = len(self._examples)
+        counts = _ngrams(contribution['banglish'], self.ngram)
+        norm = math.sqrt(sum(count * count for count in counts.values())) or 1.0
+        for gram, count in counts.items():
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[gram] = _Postings()
+            postings.append(doc_id, count / norm)
+        example = format_example(contribution)
+        self._doc_ids[example].append(doc_id)
+        self._examples.append(example)
+        self._sources.append(' '.join(contribution['banglish'].lower().split()))
+
+    def remove(self, contributions):
+        """Stop returning these contributions from searches."""
+        with self._lock:
+            removed = set(self._removed)
+            for contribution in contributions:
+                removed.update(self._doc_ids.pop(format_example(contribution), ()))
+            self._removed = frozenset(removed)
+
+    def search(self, text, k=10):
+        """Return up to k (score, doc_id) pairs, best first."""
+        total = len(self._examples)
+        if not total:
+            return []
+
+        matched = []
+        for gram, count in _ngrams(text, self.ngram).items():
+            postings = self._postings.get(gram)
+            if postings is not None:
+                matched.append((postings.size, count, postings))
+        if not matched:
+            return []
+        matched.sort(key=lambda item: item[0])
+
+        ids, weights = [], []
+        read = 0
+        for df, count, postings in matched:
+            if ids and read + df > self.max_postings:
+                break
+            idf = math.log((total + 1) / (df + 1)) + 1
+            ids.append(postings.ids[:df])
+            weights.append(postings.weights[:df] * (count * idf * idf))
+            read += df
+
+        doc_ids = np.concatenate(ids)
+        scores = np.bincount(doc_ids, weights=np.concatenate(weights))
+        removed = self._removed
+        if removed:
+            removed = np.fromiter(removed, dtype=np.int64, count=len(removed))
+            scores[removed[removed < len(scores)]] = 0
+        # A document appears at most once per n-gram, so the best k * n-grams
+        # postings always cover the best k distinct documents
+        limit = k * len(ids)
+        if len(doc_ids) > limit:
+            doc_ids = doc_ids[np.argpartition(scores[doc_ids], -limit)[-limit:]]
+        candidates = np.unique(doc_ids)
+        candidates = candidates[np.argsort(scores[candidates])[::-1][:k]]
+        return [(float(scores[doc_id]), int(doc_id)) for doc_id in candidates if scores[doc_id] > 0]
+
+    def render(self, text, k=10, token_budget=400):
+        """Render the most similar examples that fit in token_budget."""
+        examples = []
+        seen = set()
+        used = 0
+        for _, doc_id in self.search(text, k * 2):
+            if self._sources[doc_id] in seen:
+                continue
+            example = self._examples[doc_id]
+            cost = estimate_tokens(example)
+            if used + cost > token_budget:
+                continue
+            seen.add(self._sources[doc_id])
+            examples.append(example)
+            used += cost
+            if len(examples) == k:
+                break
+        return "\n".join(examples)
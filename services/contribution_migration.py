@@ -0,0 +1,154 @@
+"""Import file-per-contribution JSON files into the contributions collection.
+
+Contributions used to be saved as one JSON file each in contributions/.
+This reads them with a single directory scan and inserts them with
+insert_many in batches. Each document records the file it came from
+under a unique index, so the import can be re-run safely: files that
+were already imported are skipped.
+
+Documents also get the content hash that new submissions are checked
+against. Files whose contents match one already stored, in the same
+batch or from earlier, are counted as votes on it instead of being
+inserted, and their names are kept under merged_files so a re-run does
+not count them twice.
+
+    python -m services.contribution_migration [contributions/] [--delete]
+"""
+import argparse
+import json
+import os
+from datetime import datetime
+
+from pymongo.errors import BulkWriteError
+
+from services.contribution_dedup import content_hash
+
+DUPLICATE_KEY = 11000
+
+
+def _document(entry, status):
+    with open(entry.path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    try:
+        submitted_at = datetime.fromisoformat(data['timestamp'])
+    except (KeyError, TypeError, ValueError):
+        submitted_at = datetime.fromtimestamp(entry.stat().st_mtime)
+    return {
+        'banglish': data['banglish'],
+        'bengali': data['bengali'],
+        'user_id': None,
+        'feedback': data.get('feedback') or None,
+        'status': status,
+        'submitted_at': submitted_at,
+        'reviewed_at': None,
+        'reviewer_id': None,
+        'reviewer_comment': None,
+        'votes': 1,
+        'content_hash': content_hash(data['banglish'], data['bengali']),
+        'source_file': entry.name
+    }
+
+
+def _merge_duplicates(batch):
+    """Fold documents that share a content hash into the first of them."""
+    kept = {}
+    for document in batch:
+        first = kept.setdefault(document['content_hash'], document)
+        if first is not document:
+            first['votes'] += 1
+            first.setdefault('merged_files', []).append(document['source_file'])
+    return list(kept.values())
+
+
+def _insert(collection, documents):
+    """Insert documents and return the indexes of those that were duplicates."""
+    try:
+        collection.insert_many(documents, ordered=False)
+        return set()
+    except BulkWriteError as e:
+        errors = e.details.get('writeErrors', [])
+        if any(error.get('code') != DUPLICATE_KEY for error in errors):
+            raise
+        return {error['index'] for error in errors}
+
+
+def _add_votes(collection, document):
+    """Count a duplicate document as votes on the stored one with its
+    content. Returns False if its file was already imported."""
+    name = document['source_file']
+    if collection.find_one({'source_file': name}, {'_id': 1}):
+        return False
+    result = collection.update_one(
+        {'content_hash': document['content_hash'], 'merged_files': {'$ne': name}},
+        {
+            '$inc': {'votes': document['votes']},
+            '$push': {'merged_files': {'$each': [name] + document.get('merged_files', [])}}
+        }
+    )
+    return result.modified_count == 1
+
+
+def migrate(directory, collection, batch_size=1000, status='pending', delete=False):
+    """Import every *.json file in directory; return counts of what happened."""
+    counts = {'inserted': 0, 'merged': 0, 'skipped': 0, 'failed': 0, 'deleted': 0}
+    batch = []
+    paths = []
+
+    def flush():
+        documents = _merge_duplicates(batch)
+        duplicates = _insert(collection, documents)
+        counts['inserted'] += len(documents) - len(duplicates)
+        for index, document in enumerate(documents):
+            if index not in duplicates:
+                counts['merged'] += document['votes'] - 1
+            elif _add_votes(collection, document):
+                counts['merged'] += document['votes']
+            else:
+                counts['skipped'] += document['votes']
+        if delete:
+            for path in paths:
+                os.unlink(path)
+                counts['deleted'] += 1
+        batch.clear()
+        paths.clear()
+
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.json') or not entry.is_file():
+                continue
+            try:
+                batch.append(_document(entry, status))
+                paths.append(entry.path)
+            except Exception as e:
+                print(f"Error reading contribution {entry.name}: {e}")
+                counts['failed'] += 1
+                continue
+            if len(batch) >= batch_size:
+                flush()
+    if batch:
+        flush()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Import contribution JSON files into MongoDB.')
+    parser.add_argument('directory', nargs='?', default='contributions')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--status', default='pending', choices=('pending', 'approved'),
+                        help='Review status to give the imported contributions')
+    parser.add_argument('--delete', action='store_true',
+                        help='Delete each file once it is stored in MongoDB')
+    args = parser.parse_args(argv)
+
+    from config.database import contributions, ensure_indexes
+    # Re-runs rely on the unique source_file index to skip imported files,
+    # and duplicates on the unique content_hash index
+    ensure_indexes()
+    counts = migrate(args.directory, contributions, args.batch_size, args.status, args.delete)
+    print(f"Imported {counts['inserted']}, counted as votes {counts['merged']}, "
+          f"already present {counts['skipped']}, "
+          f"unreadable {counts['failed']}, deleted {counts['deleted']}")
+
+
+if __name__ == '__main__':
+    main()
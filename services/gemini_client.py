@@ -0,0 +1,109 @@
+"""Concurrency-limited async access to a Gemini model."""
+import asyncio
+import threading
+
+from services.metrics import track
+
+
+class AsyncGemini:
+    """Run generate_content_async with at most max_concurrency calls in flight.
+
+    Requests beyond the limit wait on the semaphore instead of piling more
+    load onto the API; while waiting they hold no thread.
+    """
+
+    def __init__(self, model, max_concurrency=32):
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+
+    async def generate(self, prompt, **kwargs):
+        """Return the stripped response text for prompt."""
+        await self._acquire()
+        try:
+            response = await self.model.generate_content_async(prompt, **kwargs)
+            return response.text.strip()
+        finally:
+            self._release()
+
+    async def stream(self, prompt, **kwargs):
+        """Yield the response text for prompt chunk by chunk as Gemini streams it."""
+        await self._acquire()
+        try:
+            response = await self.model.generate_content_async(prompt, stream=True, **kwargs)
+            async for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+        finally:
+            self._release()
+
+    async def _acquire(self):
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+
+    def _release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+
+class LazyModel:
+    """A GenerativeModel created on first use.
+
+    Importing google.generativeai takes about a second and tens of MB, so
+    it is left until the first Gemini call instead of slowing down every
+    worker's startup. Attributes pass through to the model.
+    """
+
+    def __init__(self, model_name, api_key=None):
+        self.model_name = model_name
+        self.api_key = api_key
+        self._model = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    import google.generativeai as genai
+                    genai.configure(api_key=self.api_key)
+                    self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
+
+
+class InstrumentedModel:
+    """Wrap a GenerativeModel so every Gemini call is timed as the 'gemini' stage.
+
+    Streamed responses are timed until the last chunk arrives, as the
+    'gemini_stream' stage. Other attributes pass through to the model.
+    """
+
+    def __init__(self, model):
+        self.model = model
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def generate_content(self, prompt, **kwargs):
+        with track('gemini'):
+            return self.model.generate_content(prompt, **kwargs)
+
+    async def generate_content_async(self, prompt, stream=False, **kwargs):
+        if stream:
+            return self._stream(prompt, kwargs)
+        with track('gemini'):
+            return await self.model.generate_content_async(prompt, **kwargs)
+
+    async def _stream(self, prompt, kwargs):
+        with track('gemini_stream'):
+            response = await self.model.generate_content_async(prompt, stream=True, **kwargs)
+            async for chunk in response:
+                yield chunk
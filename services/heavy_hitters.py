@@ -0,0 +1,98 @@
+"""Space-Saving heavy-hitters summary.
+
+Tracks at most `capacity` items. An unseen item arriving when the summary
+is full replaces one with the smallest count and inherits that count as
+its error bound, so every item whose true frequency exceeds
+total / capacity is guaranteed to be kept. Items are grouped into buckets
+by count, which makes a unit increment O(1).
+
+Summaries merge by adding counts and keeping the largest `capacity`,
+which lets per-hour and per-day summaries be combined into windows.
+"""
+
+
+class SpaceSaving:
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self._counts = {}  # item -> (count, error)
+        self._buckets = {}  # count -> dict of items with that count, used as an ordered set
+        self._min = 0
+
+    def __len__(self):
+        return len(self._counts)
+
+    def __bool__(self):
+        return bool(self._counts)
+
+    def add(self, item, count=1):
+        if item in self._counts:
+            old, error = self._counts.pop(item)
+            self._unbucket(item, old, old + count)
+            self._place(item, old + count, error)
+        elif len(self._counts) < self.capacity:
+            self._place(item, count, 0)
+            if len(self._counts) == 1 or count < self._min:
+                self._min = count
+        else:
+            smallest = self._min
+            victim = next(iter(self._buckets[smallest]))
+            del self._counts[victim]
+            self._unbucket(victim, smallest, smallest + count)
+            self._place(item, smallest + count, smallest)
+
+    def _place(self, item, count, error):
+        self._counts[item] = (count, error)
+        self._buckets.setdefault(count, {})[item] = None
+
+    def _unbucket(self, item, count, new_count):
+        """Take an item out of its bucket before it moves to new_count."""
+        bucket = self._buckets[count]
+        del bucket[item]
+        if not bucket:
+            del self._buckets[count]
+            if count == self._min:
+                # A unit step lands in the next bucket; larger ones need a scan
+                if new_count == count + 1 or not self._buckets:
+                    self._min = new_count
+                else:
+                    self._min = min(min(self._buckets), new_count)
+
+    def merge(self, entries):
+        """Fold in (item, count, error) entries, e.g. another summary's."""
+        combined = {item: [count, error] for item, (count, error) in self._counts.items()}
+        for item, count, error in entries:
+            if item in combined:
+                combined[item][0] += count
+                combined[item][1] += error
+            else:
+                combined[item] = [count, error]
+        kept = sorted(combined.items(), key=lambda x: x[1][0], reverse=True)[:self.capacity]
+        self._counts = {}
+        self._buckets = {}
+        for item, (count, error) in kept:
+            self._place(item, count, error)
+        self._min = kept[-1][1][0] if kept else 0
+        return self
+
+    def entries(self):
+        """Return [item, count, error] for every tracked item, largest first."""
+        return [
+            [item, count, error]
+            for count in sorted(self._buckets, reverse=True)
+            for item in self._buckets[count]
+            for error in (self._counts[item][1],)
+        ]
+
+    def top(self, k=10):
+        """Return the k items with the highest estimated counts."""
+        result = []
+        for count in sorted(self._buckets, reverse=True):
+            for item in self._buckets[count]:
+                result.append((item, count))
+                if len(result) == k:
+                    return result
+        return result
+
+    @classmethod
+    def from_entries(cls, entries, capacity=1000):
+        return cls(capacity).merge(entries or [])
@@ -0,0 +1,42 @@
+"""Strict parsing of JSON replies from Gemini.
+
+Models often wrap JSON in a Markdown code fence or add a sentence around
+it. extract_json() takes the outermost JSON value out of such a reply and
+the parse_* helpers check it has the expected shape, raising ValueError
+rather than guessing.
+"""
+import json
+import re
+
+_FENCE_RE = re.compile(r'^```(?:json)?\s*(.*?)\s*```$', re.DOTALL)
+
+
+def extract_json(text):
+    """Return the JSON value contained in a model reply."""
+    text = text.strip()
+    fenced = _FENCE_RE.match(text)
+    if fenced:
+        text = fenced.group(1)
+
+    starts = [i for i in (text.find('{'), text.find('[')) if i != -1]
+    if not starts:
+        raise ValueError("Response contains no JSON")
+    start = min(starts)
+    end = text.rfind('}' if text[start] == '{' else ']')
+    try:
+        return json.loads(text[start:end + 1])
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Response is not valid JSON: {e}") from e
+
+
+def parse_json_object(text, keys):
+    """Return the reply's JSON object, requiring a non-empty string for each key."""
+    data = extract_json(text)
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+    for key in keys:
+        value = data.get(key)
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f"Response is missing '{key}'")
+        data[key] = value.strip()
+    return data
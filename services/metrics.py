@@ -0,0 +1,269 @@
+"""In-process metrics with Prometheus text exposition.
+
+Counters, gauges and fixed-bucket histograms, each keyed by a tuple of
+label values. Recording is a dict update under a per-metric lock, cheap
+enough for every request. Histograms estimate quantiles by interpolating
+within buckets, the way Prometheus' histogram_quantile() does. Callback
+metrics read values such as cache statistics only when scraped.
+
+Every worker process keeps its own numbers; Prometheus scrapes and sums
+them per instance.
+"""
+import inspect
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+# Seconds, from 1 ms to a minute
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, labels, value) for labels, value in self._values.items()]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+
+class Callback(_Metric):
+    """A metric whose samples come from fn() at scrape time.
+
+    fn returns a number, or a dict mapping label tuples to numbers.
+    """
+
+    def __init__(self, name, help, fn, kind='gauge', labelnames=()):
+        super().__init__(name, help, labelnames)
+        self.kind = kind
+        self.fn = fn
+
+    def samples(self):
+        try:
+            values = self.fn()
+        except Exception as e:
+            print(f"Error collecting metric {self.name}: {e}")
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [(self.name, labels, value) for labels, value in values.items()]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # Per-bucket (not cumulative) counts, the +Inf bucket last, then sum
+                state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def snapshot(self, *labels):
+        """Return (per-bucket counts, total count, sum) for the labels."""
+        with self._lock:
+            state = list(self._values.get(labels) or [0] * (len(self.buckets) + 1) + [0.0])
+        counts = state[:-1]
+        return counts, sum(counts), state[-1]
+
+    def quantile(self, q, *labels):
+        counts, total, _ = self.snapshot(*labels)
+        return _bucket_quantile(q, self.buckets, counts, total)
+
+    def label_sets(self):
+        with self._lock:
+            return list(self._values)
+
+    def samples(self):
+        samples = []
+        for labels in self.label_sets():
+            counts, total, value_sum = self.snapshot(*labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", labels + (_format_value(bound),), cumulative))
+            samples.append((f"{self.name}_count", labels, total))
+            samples.append((f"{self.name}_sum", labels, value_sum))
+        return samples
+
+
+def _bucket_quantile(q, buckets, counts, total):
+    if not total:
+        return None
+    rank = q * total
+    cumulative = 0
+    for i, count in enumerate(counts):
+        if cumulative + count >= rank and count:
+            if i == len(buckets):
+                # Beyond the largest bucket all we know is the lower bound
+                return buckets[-1]
+            lower = buckets[i - 1] if i else 0
+            return lower + (buckets[i] - lower) * (rank - cumulative) / count
+        cumulative += count
+    return buckets[-1]
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()):
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def callback(self, name, help, fn, kind='gauge', labelnames=()):
+        return self._register(Callback(name, help, fn, kind, labelnames))
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            labelnames = metric.labelnames
+            for name, labels, value in metric.samples():
+                names = labelnames + ('le',) if name.endswith('_bucket') else labelnames
+                if names:
+                    pairs = ','.join(f'{key}="{_escape(val)}"' for key, val in zip(names, labels))
+                    name = f"{name}{{{pairs}}}"
+                lines.append(f"{name} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'banglish_stage_seconds', 'Time spent in each pipeline stage', ('stage',))
+STAGE_IN_FLIGHT = REGISTRY.gauge(
+    'banglish_stage_in_flight', 'Calls currently inside each pipeline stage', ('stage',))
+STAGE_ERRORS = REGISTRY.counter(
+    'banglish_stage_errors_total', 'Calls to each pipeline stage that raised', ('stage',))
+REQUEST_SECONDS = REGISTRY.histogram(
+    'banglish_request_seconds', 'Time to serve each route', ('route', 'method'))
+GEMINI_RETRIES = REGISTRY.counter(
+    'banglish_gemini_retries_total', 'Gemini requests sent again after a failure')
+
+
+@contextmanager
+def track(stage):
+    """Time a block as a pipeline stage, counting it while in flight."""
+    STAGE_IN_FLIGHT.inc(stage)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage)
+        STAGE_IN_FLIGHT.dec(stage)
+
+
+def timed(stage):
+    """Decorator form of track() for plain and async functions."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with track(stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with track(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def stage_summary(quantiles=(0.5, 0.95, 0.99)):
+    """Return {stage: {'count', 'p50', 'p95', 'p99', 'in_flight', 'errors'}}, times in ms."""
+    summary = {}
+    for labels in sorted(STAGE_SECONDS.label_sets()):
+        stage = labels[0]
+        counts, total, _ = STAGE_SECONDS.snapshot(stage)
+        row = {
+            'count': total,
+            'in_flight': STAGE_IN_FLIGHT.value(stage),
+            'errors': STAGE_ERRORS.value(stage)
+        }
+        for q in quantiles:
+            value = _bucket_quantile(q, STAGE_SECONDS.buckets, counts, total)
+            row[f"p{round(q * 100)}"] = round(value * 1000, 1) if value is not None else None
+        summary[stage] = row
+    return summary
@@ -0,0 +1,95 @@
+"""Bounded, off-thread bcrypt hashing.
+
+bcrypt is deliberately slow, and a burst of logins hashing on the web
+worker threads would hold up every other request. PasswordHasher runs
+the work on its own small thread pool (bcrypt releases the GIL while it
+hashes) and admits at most max_workers + max_queue operations at once.
+Anything beyond that fails straight away with HasherBusy, which the
+routes turn into a 429, instead of queueing behind the burst. So does an
+operation still waiting for its result after timeout seconds.
+
+Flask routes served through WsgiToAsgi all share one thread, so /login
+and /signup are also served as coroutines that await hash_async() and
+check_async(); the slot check then runs on the event loop and a burst of
+sign-ins never holds up the Flask routes.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import bcrypt
+
+from services.metrics import REGISTRY, track
+
+HASHES_REJECTED = REGISTRY.counter(
+    'banglish_password_hash_rejected_total', 'Password hashing requests refused because the queue was full')
+HASHES_TIMED_OUT = REGISTRY.counter(
+    'banglish_password_hash_timed_out_total', 'Password hashing requests that gave up waiting for a result')
+
+
+class HasherBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    def __init__(self, rounds=12, max_workers=2, max_queue=16, timeout=30):
+        self.rounds = rounds
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+
+    def hash(self, password):
+        """Return the bcrypt hash of password at the configured cost."""
+        return self._run(_hash, password.encode('utf-8'), self.rounds)
+
+    def check(self, password, hashed):
+        return self._run(_check, password.encode('utf-8'), hashed)
+
+    async def hash_async(self, password):
+        return await self._run_async(_hash, password.encode('utf-8'), self.rounds)
+
+    async def check_async(self, password, hashed):
+        return await self._run_async(_check, password.encode('utf-8'), hashed)
+
+    def _submit(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            HASHES_REJECTED.inc()
+            raise HasherBusy('Too many sign-ins right now, please try again shortly')
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _run(self, func, *args):
+        future = self._submit(func, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise _timed_out() from None
+
+    async def _run_async(self, func, *args):
+        future = self._submit(func, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            raise _timed_out() from None
+
+
+def _timed_out():
+    # A hash that is already running keeps its slot until it finishes, so a
+    # stuck pool still fills up and turns later requests away
+    HASHES_TIMED_OUT.inc()
+    return HasherBusy('Sign-in is taking too long right now, please try again shortly')
+
+
+def _hash(password, rounds):
+    with track('password_hash'):
+        return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+
+def _check(password, hashed):
+    with track('password_check'):
+        return bcrypt.checkpw(password, hashed)
@@ -0,0 +1,152 @@
+"""Content-addressed cache for exported PDFs.
+
+A PDF is keyed on a hash of its text, title, caption, font and the layout
+version, so the same export is only rendered once and a layout change
+simply stops old entries from matching. Recently used PDFs are kept in
+memory and a larger set on disk, each tier evicting its least recently
+used entries once it goes over its byte budget. The key doubles as the
+response ETag.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from services.pdf_layout import LAYOUT_VERSION
+
+
+def pdf_key(bengali_text, title, caption, font_name):
+    raw = '\0'.join([str(LAYOUT_VERSION), font_name, title, caption, bengali_text])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class PdfCache:
+    def __init__(self, max_memory_bytes=64 * 2**20, directory=None, max_disk_bytes=512 * 2**20):
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.directory = Path(directory) if directory else None
+        self._memory = OrderedDict()  # key -> PDF bytes
+        self._memory_bytes = 0
+        self._disk = OrderedDict()  # key -> file size, least recently used first
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.loaded = self.directory is None
+
+    def load(self):
+        """Create the cache directory and index the PDFs already in it.
+
+        Until this has run the disk tier is skipped: lookups only see
+        memory and new PDFs are not written to disk.
+        """
+        if self.loaded:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.pdf'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+        with self._lock:
+            for _, key, size in sorted(entries):
+                self._disk[key] = size
+                self._disk_bytes += size
+            self._evict_disk()
+            self.loaded = True
+
+    def get(self, key):
+        """Return the cached PDF bytes, or None on a miss."""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return data
+            on_disk = key in self._disk
+
+        if on_disk:
+            path = self._path(key)
+            try:
+                data = path.read_bytes()
+                os.utime(path)
+            except OSError:
+                data = None
+            with self._lock:
+                if data is None:
+                    self._forget_disk(key)
+                else:
+                    if key in self._disk:
+                        self._disk.move_to_end(key)
+                    self._store_memory(key, data)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return data
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, data):
+        with self._lock:
+            self._store_memory(key, data)
+            write_disk = self.directory is not None and self.loaded and key not in self._disk
+        if write_disk and len(data) <= self.max_disk_bytes:
+            path = self._path(key)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            try:
+                tmp_path.write_bytes(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"Error writing PDF cache: {e}")
+                return
+            with self._lock:
+                if key not in self._disk:
+                    self._disk[key] = len(data)
+                    self._disk_bytes += len(data)
+                    self._evict_disk()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'disk_entries': len(self._disk),
+                'disk_bytes': self._disk_bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+    def _path(self, key):
+        return self.directory / f"{key}.pdf"
+
+    def _store_memory(self, key, data):
+        if len(data) > self.max_memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _forget_disk(self, key):
+        size = self._disk.pop(key, None)
+        if size is not None:
+            self._disk_bytes -= size
+
+    def _evict_disk(self):
+        while self._disk_bytes > self.max_disk_bytes:
+            key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            try:
+                os.unlink(self._path(key))
+            except FileNotFoundError:
+                pass
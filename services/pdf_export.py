@@ -0,0 +1,103 @@
+"""PDF export: the available Bengali fonts and document rendering.
+
+Kept free of the web app so PDF worker processes can import it cheaply.
+ReportLab itself is only imported once a PDF is rendered or a font loaded,
+so web workers that never export don't pay for it.
+"""
+import io
+import threading
+from pathlib import Path
+
+from services.pdf_layout import render_document
+
+# Available fonts for PDF
+BENGALI_FONTS = {
+    'kalpurush': {
+        'name': 'Kalpurush',
+        'file': 'kalpurush.ttf',
+        'display': 'Kalpurush (কালপুরুষ)'
+    },
+    'nikosh': {
+        'name': 'Nikosh',
+        'file': 'Nikosh.ttf',
+        'display': 'Nikosh (নিকষ)'
+    },
+    'mitra': {
+        'name': 'Mitra',
+        'file': 'mitra.ttf',
+        'display': 'Mitra (মিত্র)'
+    },
+    'solaimanlipi': {
+        'name': 'MuktiNarrow',
+        'file': 'muktinarrow.ttf',
+        'display': 'Mukti Narrow (মুক্তি নার্দান)'
+    }
+}
+
+FONTS_DIR = Path(__file__).resolve().parent.parent / 'static' / 'fonts'
+
+# Parsed fonts are registered with ReportLab once and shared by every
+# export. Sharing is not thread-safe on its own: each document subsets the
+# font when it is saved, reading glyphs through the font's one file parser,
+# and two saves at once can raise IndexError. Documents using the same font
+# therefore save in turn; laying out pages still runs concurrently.
+_registered_fonts = set()
+_font_lock = threading.Lock()
+_save_locks = {}  # font name -> lock held while saving
+
+
+def font_key_for(font_choice):
+    """Return the BENGALI_FONTS key of the chosen font, defaulting to Kalpurush."""
+    return font_choice if font_choice in BENGALI_FONTS else 'kalpurush'
+
+
+def font_name_for(font_choice):
+    """Return the ReportLab name of the chosen font, defaulting to Kalpurush."""
+    return BENGALI_FONTS[font_key_for(font_choice)]['name']
+
+
+def register_font(font_choice):
+    """Register the chosen Bengali font if needed and return its name."""
+    font_info = BENGALI_FONTS.get(font_choice, BENGALI_FONTS['kalpurush'])
+    font_name = font_info['name']
+    if font_name not in _registered_fonts:
+        with _font_lock:
+            if font_name not in _registered_fonts:
+                from reportlab.pdfbase import pdfmetrics
+                from reportlab.pdfbase.ttfonts import TTFont
+                pdfmetrics.registerFont(TTFont(font_name, str(FONTS_DIR / font_info['file'])))
+                _save_locks[font_name] = threading.Lock()
+                _registered_fonts.add(font_name)
+    return font_name
+
+
+def warm_fonts():
+    for font_choice in BENGALI_FONTS:
+        try:
+            register_font(font_choice)
+        except Exception as e:
+            print(f"Error loading font {font_choice}: {e}")
+
+
+def create_pdf(bengali_text, title, caption, font_choice='kalpurush'):
+    """Render the text to a PDF and return it as a BytesIO."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    # Create a PDF buffer
+    buffer = io.BytesIO()
+    
+    # Create the PDF object
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    
+    # Register Bengali font
+    font_name = register_font(font_choice)
+    
+    # Lay out the title, caption and text across as many pages as needed
+    render_document(pdf, font_name, title, caption, bengali_text)
+    
+    with _save_locks[font_name]:
+        pdf.save()
+    
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,164 @@
+"""Background PDF rendering jobs.
+
+Large exports are rendered in a bounded process pool instead of the web
+worker. Each worker process loads the fonts once when it starts. Finished
+PDFs are written to an artifact directory under the job id, which makes
+the directory the source of truth for job status, so any web worker can
+answer for a job another one accepted. Artifacts older than the TTL are
+removed.
+"""
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from services.pdf_export import create_pdf, warm_fonts
+
+_JOB_ID_CHARS = set('0123456789abcdef')
+
+
+def _render_to_file(path, bengali_text, title, caption, font_choice):
+    """Worker entry point: render a PDF and move it into place atomically."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(create_pdf(bengali_text, title, caption, font_choice).getbuffer())
+    os.replace(tmp_path, path)
+
+
+class QueueFull(Exception):
+    pass
+
+
+class PdfJobQueue:
+    def __init__(self, artifact_dir, max_workers=2, max_pending=50, ttl=3600):
+        self.artifact_dir = Path(artifact_dir)
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._pool = None
+        self.pending = 0
+        self._lock = threading.Lock()
+        self._last_cleanup = 0
+
+    def _get_pool(self):
+        if self._pool is None:
+            # Spawned workers start clean rather than inheriting the web
+            # server's threads and connections. They import only this module
+            # and pdf_export; spawn would also re-run a script's __main__
+            # module in each worker, which app.py turns off when run directly.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=warm_fonts
+            )
+        return self._pool
+
+    def _path(self, job_id, suffix):
+        return self.artifact_dir / f"{job_id}{suffix}"
+
+    def submit(self, bengali_text, title, caption, font_choice):
+        """Queue a render and return its job id; raises QueueFull when busy."""
+        self.cleanup()
+        with self._lock:
+            if self.pending >= self.max_pending:
+                raise QueueFull('Too many PDF exports in progress, please try again shortly')
+            self.pending += 1
+
+        job_id = uuid.uuid4().hex
+        self.artifact_dir.mkdir(parents=True, exist_ok=True)
+        self._path(job_id, '.pending').touch()
+        args = (str(self._path(job_id, '.pdf')), bengali_text, title, caption, font_choice)
+        try:
+            pool, future = self._submit(args)
+        except Exception as e:
+            self._fail(job_id, e)
+            return job_id
+        future.add_done_callback(lambda f: self._finish(job_id, pool, f))
+        return job_id
+
+    def _submit(self, args):
+        for attempt in range(2):
+            with self._lock:
+                pool = self._get_pool()
+            try:
+                return pool, pool.submit(_render_to_file, *args)
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for using too much memory) and
+                # took the pool with it; start a new one and try once more
+                self._discard_pool(pool)
+                if attempt:
+                    raise
+
+    def _discard_pool(self, pool):
+        """Drop a broken pool so the next submit starts a fresh one."""
+        with self._lock:
+            if pool is self._pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _fail(self, job_id, error):
+        with self._lock:
+            self.pending -= 1
+        self._path(job_id, '.error').write_text(str(error) or type(error).__name__, encoding='utf-8')
+        self._path(job_id, '.pending').unlink(missing_ok=True)
+
+    def _finish(self, job_id, pool, future):
+        error = future.exception()
+        if error is None:
+            with self._lock:
+                self.pending -= 1
+            self._path(job_id, '.pending').unlink(missing_ok=True)
+            return
+        if isinstance(error, BrokenProcessPool):
+            self._discard_pool(pool)
+        self._fail(job_id, error)
+
+    def status(self, job_id):
+        """Return {'status': 'done'|'pending'|'failed'|'unknown'[, 'error']}."""
+        if not _valid_job_id(job_id):
+            return {'status': 'unknown'}
+        if self._path(job_id, '.pdf').exists():
+            return {'status': 'done'}
+        error_path = self._path(job_id, '.error')
+        if error_path.exists():
+            return {'status': 'failed', 'error': error_path.read_text(encoding='utf-8')}
+        if self._path(job_id, '.pending').exists():
+            return {'status': 'pending'}
+        return {'status': 'unknown'}
+
+    def artifact_path(self, job_id):
+        """Return the finished PDF's path, or None if it isn't ready."""
+        if not _valid_job_id(job_id):
+            return None
+        path = self._path(job_id, '.pdf')
+        return path if path.exists() else None
+
+    def cleanup(self, force=False):
+        """Remove artifacts older than the TTL, at most once a minute."""
+        now = time.time()
+        if not force and now - self._last_cleanup < 60:
+            return
+        self._last_cleanup = now
+        try:
+            entries = list(os.scandir(self.artifact_dir))
+        except FileNotFoundError:
+            # Created by the first submit
+            return
+        for entry in entries:
+            try:
+                if now - entry.stat().st_mtime > self.ttl:
+                    os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _valid_job_id(job_id):
+    return len(job_id) == 32 and set(job_id) <= _JOB_ID_CHARS
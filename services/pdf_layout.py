@@ -0,0 +1,123 @@
+"""Width-aware, multi-page text layout for PDF export.
+
+Words are measured with pdfmetrics.stringWidth (cached per font and size)
+and each paragraph is broken into lines that minimize the squared slack
+at the end of every line but the last. A line can only hold as many words
+as fit in the column, so the search looks back a bounded number of words
+and layout stays linear in the length of the text.
+"""
+from functools import lru_cache
+
+# Only the page size here; the font metrics module is loaded when first needed
+from reportlab.lib.pagesizes import A4
+
+# Bump whenever the rendered output changes
+LAYOUT_VERSION = 1
+
+PAGE_WIDTH, PAGE_HEIGHT = A4
+MARGIN = 50
+LINE_SPACING = 1.5
+TITLE_SIZE = 16
+BODY_SIZE = 12
+TITLE_TOP = 800
+CAPTION_TOP = 770
+BODY_TOP = 700
+
+
+@lru_cache(maxsize=65536)
+def string_width(text, font_name, font_size):
+    from reportlab.pdfbase import pdfmetrics
+    return pdfmetrics.stringWidth(text, font_name, font_size)
+
+
+def _split_long_word(word, font_name, font_size, max_width):
+    """Break a word wider than the column into pieces that fit."""
+    pieces = []
+    piece = ''
+    for char in word:
+        if piece and string_width(piece + char, font_name, font_size) > max_width:
+            pieces.append(piece)
+            piece = ''
+        piece += char
+    pieces.append(piece)
+    return pieces
+
+
+def wrap_paragraph(text, font_name, font_size, max_width):
+    """Return the lines of one paragraph, broken for minimum raggedness."""
+    words = []
+    for word in text.split():
+        if string_width(word, font_name, font_size) > max_width:
+            words.extend(_split_long_word(word, font_name, font_size, max_width))
+        else:
+            words.append(word)
+    if not words:
+        return ['']
+
+    widths = [string_width(word, font_name, font_size) for word in words]
+    space = string_width(' ', font_name, font_size)
+    count = len(words)
+
+    # cost[j]: best total badness for words[:j]; breaks[j]: where that line starts
+    cost = [0.0] + [float('inf')] * count
+    breaks = [0] * (count + 1)
+    for end in range(1, count + 1):
+        width = -space
+        for start in range(end - 1, -1, -1):
+            width += widths[start] + space
+            if width > max_width and start < end - 1:
+                break
+            slack = 0.0 if end == count else max_width - width
+            total = cost[start] + slack * slack
+            if total < cost[end]:
+                cost[end] = total
+                breaks[end] = start
+
+    lines = []
+    end = count
+    while end > 0:
+        start = breaks[end]
+        lines.append(' '.join(words[start:end]))
+        end = start
+    lines.reverse()
+    return lines
+
+
+def wrap_text(text, font_name, font_size, max_width):
+    """Wrap text, keeping its line breaks as paragraph breaks."""
+    lines = []
+    for paragraph in text.splitlines() or ['']:
+        lines.extend(wrap_paragraph(paragraph, font_name, font_size, max_width))
+    return lines
+
+
+def render_document(pdf, font_name, title, caption, text):
+    """Draw the title, caption and body text, adding pages as needed."""
+    max_width = PAGE_WIDTH - 2 * MARGIN
+
+    y = TITLE_TOP
+    y = _draw_lines(pdf, wrap_text(title, font_name, TITLE_SIZE, max_width), font_name, TITLE_SIZE, y)
+    y = min(CAPTION_TOP, y)
+    y = _draw_lines(pdf, wrap_text(caption, font_name, BODY_SIZE, max_width), font_name, BODY_SIZE, y)
+    y = min(BODY_TOP, y - BODY_SIZE * LINE_SPACING)
+
+    leading = BODY_SIZE * LINE_SPACING
+    lines = wrap_text(text, font_name, BODY_SIZE, max_width)
+    while lines:
+        fit = max(1, int((y - MARGIN) // leading) + 1)
+        y = _draw_lines(pdf, lines[:fit], font_name, BODY_SIZE, y)
+        lines = lines[fit:]
+        if lines:
+            pdf.showPage()
+            y = PAGE_HEIGHT - MARGIN - BODY_SIZE
+
+
+def _draw_lines(pdf, lines, font_name, font_size, y):
+    """Draw lines from baseline y down and return the next free baseline."""
+    leading = font_size * LINE_SPACING
+    text_object = pdf.beginText(MARGIN, y)
+    text_object.setFont(font_name, font_size, leading)
+    for line in lines:
+        text_object.textLine(line)
+    pdf.drawText(text_object)
+    return y - leading * len(lines)
@@ -0,0 +1,107 @@
+"""Background startup tasks and worker readiness.
+
+Translation memory, the duplicate index and the prompt examples are all
+built from MongoDB. Loading them while app.py was imported made every
+worker start as slowly as those queries, and not at all without a
+database. They run instead as startup tasks, each on its own thread once
+the app is imported. A failed task is retried until it succeeds, and the
+readiness probe reports the worker ready once every task has. Until then
+requests are served with whatever has loaded so far.
+"""
+import threading
+import time
+
+
+class StartupTasks:
+    def __init__(self, retry_interval=5):
+        self.retry_interval = retry_interval
+        self._tasks = {}  # name -> fn
+        self._status = {}  # name -> {'state', 'seconds', 'error'}
+        self._done = threading.Event()
+        self._remaining = 0
+        self._lock = threading.Lock()
+        self._started = False
+
+    def add(self, name, fn):
+        """Run fn() at startup. It is retried after errors, so a failed
+        attempt must leave nothing half loaded."""
+        self._tasks[name] = fn
+        self._status[name] = {'state': 'pending', 'seconds': None, 'error': None}
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            self._remaining = len(self._tasks)
+        if not self._tasks:
+            self._done.set()
+        for name, fn in self._tasks.items():
+            threading.Thread(target=self._run, args=(name, fn), daemon=True).start()
+
+    def _run(self, name, fn):
+        started = time.perf_counter()
+        while True:
+            try:
+                fn()
+                break
+            except Exception as e:
+                print(f"Error in startup task {name}: {e}")
+                self._status[name] = {'state': 'retrying', 'seconds': None, 'error': str(e)}
+                time.sleep(self.retry_interval)
+        self._status[name] = {'state': 'done', 'seconds': round(time.perf_counter() - started, 3), 'error': None}
+        with self._lock:
+            self._remaining -= 1
+            if not self._remaining:
+                self._done.set()
+
+    @property
+    def ready(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Block until every task has finished; return whether they have."""
+        return self._done.wait(timeout)
+
+    def status(self):
+        return {name: dict(status) for name, status in self._status.items()}
+
+
+class HealthCheck:
+    """Run check() every `interval` seconds on a background thread and keep
+    the last result, so probes read it without waiting on the check."""
+
+    def __init__(self, check, interval=5):
+        self.check = check
+        self.interval = interval
+        self._ok = False
+        self._checked_at = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                ok = bool(self.check())
+            except Exception as e:
+                print(f"Error in health check: {e}")
+                ok = False
+            self._ok = ok
+            self._checked_at = time.monotonic()
+            time.sleep(self.interval)
+
+    @property
+    def ok(self):
+        """The last result; False until the first check has finished."""
+        return self._ok
+
+    def age(self):
+        """Seconds since the last check finished, or None before the first."""
+        if self._checked_at is None:
+            return None
+        return round(time.monotonic() - self._checked_at, 1)
@@ -0,0 +1,179 @@
+"""Content-addressed cache for Gemini conversions and titles.
+
+Entries are keyed on a hash of the normalized input text, the kind of
+result and the prompt version, so changing a prompt simply stops old
+entries from matching. An in-process LRU tier answers most lookups and an
+optional MongoDB collection keeps entries across restarts and workers.
+
+An invalidation reaches the collection and the worker that made it, but
+not the LRUs of other workers. With a collection configured, entries are
+therefore held in process for at most local_ttl seconds before being
+read back from MongoDB, which bounds how long another worker can serve a
+result an approved contribution has replaced.
+"""
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def normalize_text(text):
+    """Normalize Unicode form and collapse whitespace."""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def text_words(text):
+    return set(_WORD_RE.findall(normalize_text(text).lower()))
+
+
+def make_key(kind, text, version):
+    raw = f"{kind}\0{version}\0{normalize_text(text)}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class TranslationCache:
+    def __init__(self, maxsize=10000, ttl=86400, collection=None, local_ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.collection = collection
+        self.local_ttl = local_ttl
+        self._entries = OrderedDict()  # key -> (value, expires_at, words)
+        self._keys_by_word = defaultdict(set)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.persistent_hits = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, kind, text, version):
+        """Return the cached value, or None on a miss."""
+        key = make_key(kind, text, version)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+
+        if self.collection is not None:
+            try:
+                doc = self.collection.find_one({
+                    '_id': key,
+                    'expires_at': {'$gt': datetime.utcnow()}
+                })
+            except Exception as e:
+                print(f"Error reading translation cache: {e}")
+                doc = None
+            if doc:
+                expires_at = now + (doc['expires_at'] - datetime.utcnow()).total_seconds()
+                with self._lock:
+                    self._store(key, doc['value'], self._local_expiry(expires_at, now), set(doc.get('words', [])))
+                    self.hits += 1
+                    self.persistent_hits += 1
+                return doc['value']
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, kind, text, version, value):
+        key = make_key(kind, text, version)
+        words = text_words(text)
+        now = time.time()
+
+        with self._lock:
+            self._store(key, value, self._local_expiry(now + self.ttl, now), words)
+
+        if self.collection is not None:
+            try:
+                self.collection.replace_one({'_id': key}, {
+                    '_id': key,
+                    'kind': kind,
+                    'value': value,
+                    'words': sorted(words),
+                    'expires_at': datetime.utcnow() + timedelta(seconds=self.ttl)
+                }, upsert=True)
+            except Exception as e:
+                print(f"Error writing translation cache: {e}")
+
+    def invalidate_words(self, words):
+        """Drop every entry whose source text contains one of the given words."""
+        words = {word.lower() for word in words}
+        with self._lock:
+            keys = set()
+            for word in words:
+                keys.update(self._keys_by_word.get(word, ()))
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+
+        if self.collection is not None and words:
+            try:
+                self.collection.delete_many({'words': {'$in': sorted(words)}})
+            except Exception as e:
+                print(f"Error invalidating translation cache: {e}")
+        return len(keys)
+
+    def invalidate_contributions(self, contributions):
+        """Approval listener: drop entries affected by newly approved pairs."""
+        words = set()
+        for contribution in contributions:
+            words.update(text_words(contribution.banglish))
+        self.invalidate_words(words)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_word.clear()
+        if self.collection is not None:
+            self.collection.delete_many({})
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'persistent_hits': self.persistent_hits,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hit_rate': self.hits / lookups if lookups else 0
+            }
+
+    def _local_expiry(self, expires_at, now):
+        # Without a shared tier the LRU is the whole cache and keeps the full TTL
+        if self.collection is None:
+            return expires_at
+        return min(expires_at, now + self.local_ttl)
+
+    def _store(self, key, value, expires_at, words):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, expires_at, words)
+        for word in words:
+            self._keys_by_word[word].add(key)
+        while len(self._entries) > self.maxsize:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, _, words = self._entries.pop(key)
+        for word in words:
+            keys = self._keys_by_word.get(word)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_word[word]
@@ -0,0 +1,63 @@
+"""Word-level translation memory learned from approved contributions.
+
+Each approved Banglish/Bengali pair is aligned word by word. Pairs whose
+word counts differ can't be aligned reliably and are skipped. Every
+Banglish word keeps a tally of the Bengali spellings it was aligned with,
+and the memory only answers when one spelling holds a clear majority.
+"""
+import re
+import threading
+from collections import Counter
+
+_BANGLISH_WORD_RE = re.compile(r'[A-Za-z]+')
+_BENGALI_WORD_RE = re.compile(r'[\u0980-\u09FF\u200c\u200d]+')
+
+
+def align_pair(banglish, bengali):
+    """Return (banglish_word, bengali_word) pairs, or [] if they don't line up."""
+    source = _BANGLISH_WORD_RE.findall(banglish)
+    target = _BENGALI_WORD_RE.findall(bengali)
+    if not source or len(source) != len(target):
+        return []
+    return [(word.lower(), translation) for word, translation in zip(source, target)]
+
+
+class TranslationMemory:
+    def __init__(self):
+        self._tallies = {}  # banglish word -> Counter of bengali spellings
+        self._best = {}  # banglish word -> majority spelling
+        self._lock = threading.Lock()
+        self.pairs_seen = 0
+        self.pairs_aligned = 0
+
+    def __len__(self):
+        return len(self._best)
+
+    def add_pair(self, banglish, bengali):
+        aligned = align_pair(banglish, bengali)
+        with self._lock:
+            self.pairs_seen += 1
+            if not aligned:
+                return 0
+            self.pairs_aligned += 1
+            for word, translation in aligned:
+                tally = self._tallies.setdefault(word, Counter())
+                tally[translation] += 1
+                self._update_best(word, tally)
+        return len(aligned)
+
+    def add_contributions(self, contributions):
+        """Approval listener: learn from newly approved contributions."""
+        for contribution in contributions:
+            self.add_pair(contribution.banglish, contribution.bengali)
+
+    def lookup(self, word):
+        """Return the agreed Bengali spelling for a Banglish word, or None."""
+        return self._best.get(word.lower())
+
+    def _update_best(self, word, tally):
+        (best, count), = tally.most_common(1)
+        if count * 2 > sum(tally.values()):
+            self._best[word] = best
+        else:
+            self._best.pop(word, None)
@@ -0,0 +1,304 @@
+"""Rule-based Banglish to Bengali transliteration.
+
+The mapping tables mirror the ones spelled out in the Gemini conversion
+prompt, so everyday words can be converted locally in microseconds. Words
+the rules cannot handle with confidence are reported as unresolved so the
+caller can send just those spans to the model.
+"""
+import re
+from collections import namedtuple
+
+HASANTA = '্'
+YA_PHALA = HASANTA + 'য'
+
+# Vowels: pattern -> (independent letter, sign after a consonant)
+VOWELS = {
+    'a': ('আ', 'া'),
+    'i': ('ই', 'ি'),
+    'I': ('ঈ', 'ী'),
+    'ee': ('ঈ', 'ী'),
+    'u': ('উ', 'ু'),
+    'oo': ('উ', 'ু'),
+    'U': ('ঊ', 'ূ'),
+    'e': ('এ', 'ে'),
+    'o': ('ও', 'ো'),
+    'O': ('ও', 'ো'),
+    'oi': ('ঐ', 'ৈ'),
+    'OI': ('ঐ', 'ৈ'),
+    'ou': ('ঔ', 'ৌ'),
+    'OU': ('ঔ', 'ৌ'),
+    'rr': ('ঋ', 'ৃ'),
+    'rri': ('ঋ', 'ৃ'),
+}
+
+CONSONANTS = {
+    'k': 'ক', 'kh': 'খ', 'g': 'গ', 'gh': 'ঘ', 'ng': 'ঙ',
+    'c': 'চ', 'ch': 'ছ', 'j': 'জ', 'jh': 'ঝ', 'ny': 'ঞ',
+    'T': 'ট', 'Th': 'ঠ', 'D': 'ড', 'Dh': 'ঢ', 'N': 'ণ',
+    't': 'ত', 'th': 'থ', 'd': 'দ', 'dh': 'ধ', 'n': 'ন',
+    'p': 'প', 'ph': 'ফ', 'f': 'ফ', 'b': 'ব', 'bh': 'ভ', 'v': 'ভ', 'm': 'ম',
+    'z': 'য', 'y': 'য়', 'r': 'র', 'l': 'ল',
+    'sh': 'শ', 'S': 'ষ', 's': 'স', 'h': 'হ', 'R': 'ড়', 'Rh': 'ঢ়',
+}
+
+# Lowercase letters with more than one Bengali reading: t, d and n can be
+# dental or retroflex (ত/ট, দ/ড, ন/ণ), r is র or ড়, j and z are জ or য, s
+# and sh are স, শ or ষ, and c and ch are চ or ছ. A word spelled with any of
+# them is only converted locally if the lexicon or translation memory
+# knows it.
+AMBIGUOUS = {'t', 'th', 'd', 'dh', 'n', 'r', 'j', 'z', 's', 'sh', 'c', 'ch'}
+
+# Special clusters and phonetics
+CLUSTERS = {
+    'tr': 'ত্র', 'dr': 'দ্র', 'kr': 'ক্র', 'gr': 'গ্র', 'pr': 'প্র',
+    'br': 'ব্র', 'sr': 'স্র', 'shr': 'শ্র', 'hr': 'হ্র',
+    'jy': 'জ্ঞ', 'gy': 'গ্য', 'tw': 'ত্ব', 'dv': 'দ্ব',
+}
+
+# Clusters that already carry their vowel
+SYLLABLES = {
+    'shri': 'শ্রী',
+}
+
+# Whole words from the prompt examples, plus everyday words whose spelling
+# the rules alone can only guess at
+LEXICON = {
+    'tumi': 'তুমি', 'kemon': 'কেমন', 'acho': 'আছো',
+    'ami': 'আমি', 'valo': 'ভালো', 'bhalo': 'ভালো', 'achi': 'আছি',
+    'amar': 'আমার', 'iti': 'ইতি', 'igol': 'ঈগল', 'eegol': 'ঈগল',
+    'ki': 'কি', 'kI': 'কী', 'ujan': 'উজান', 'oojan': 'উজান',
+    'bujhi': 'বুঝি', 'boojhi': 'বুঝি', 'dUr': 'দূর', 'rriju': 'ঋজু',
+    'grriho': 'গৃহ', 'emon': 'এমন', 'OIrabot': 'ঐরাবত', 'kOI': 'কৈ',
+    'OtoprOto': 'ওতপ্রোত', 'OUpodeshik': 'ঔপদেশিক',
+    'o': 'ও', 'oi': 'ওই', 'ar': 'আর', 'na': 'না', 'bangla': 'বাংলা',
+    'tomar': 'তোমার', 'tomake': 'তোমাকে', 'tomra': 'তোমরা', 'tomader': 'তোমাদের',
+    'amra': 'আমরা', 'amake': 'আমাকে', 'amader': 'আমাদের',
+    'apni': 'আপনি', 'apnar': 'আপনার', 'apnake': 'আপনাকে',
+    'se': 'সে', 'tar': 'তার', 'ei': 'এই', 'ke': 'কে', 'keno': 'কেন',
+    'kothay': 'কোথায়', 'kokhon': 'কখন', 'ekhon': 'এখন', 'kotha': 'কথা',
+    'aj': 'আজ', 'ajke': 'আজকে', 'kal': 'কাল', 'kalke': 'কালকে',
+    'din': 'দিন', 'rat': 'রাত', 'sokal': 'সকাল', 'shokal': 'সকাল', 'bikel': 'বিকেল',
+    'bhai': 'ভাই', 'bondhu': 'বন্ধু', 'ma': 'মা', 'baba': 'বাবা',
+    'ghor': 'ঘর', 'bari': 'বাড়ি', 'kaj': 'কাজ', 'ghum': 'ঘুম',
+    'bristi': 'বৃষ্টি', 'baire': 'বাইরে', 'kichu': 'কিছু', 'shob': 'সব',
+    'onek': 'অনেক', 'khub': 'খুব', 'sundor': 'সুন্দর',
+    'kintu': 'কিন্তু', 'ebong': 'এবং', 'jodi': 'যদি', 'tahole': 'তাহলে',
+    'ha': 'হ্যাঁ', 'hae': 'হ্যাঁ', 'dhonnobad': 'ধন্যবাদ',
+    'bhalobashi': 'ভালোবাসি', 'valobashi': 'ভালোবাসি',
+    'kori': 'করি', 'koro': 'করো', 'kore': 'করে', 'korbo': 'করবো',
+    'boli': 'বলি', 'bolo': 'বলো', 'pari': 'পারি', 'paro': 'পারো',
+    'jai': 'যাই', 'jabo': 'যাবো', 'chai': 'চাই',
+    'ache': 'আছে', 'nai': 'নাই', 'nei': 'নেই', 'hobe': 'হবে', 'holo': 'হলো',
+}
+
+Segment = namedtuple('Segment', ['source', 'target', 'resolved'])
+
+_TOKEN_RE = re.compile(r'[A-Za-z]+|[^A-Za-z]+')
+_SPAN_JOINER_RE = re.compile(r'[ \t]+')
+
+
+class _Trie:
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, pattern, payload):
+        node = self.root
+        for char in pattern:
+            node = node.setdefault(char, {})
+        node[None] = payload
+
+    def matches(self, text, pos):
+        """Return (end, payload) for every pattern starting at pos, longest first."""
+        found = []
+        node = self.root
+        for end in range(pos, len(text)):
+            node = node.get(text[end])
+            if node is None:
+                break
+            if None in node:
+                found.append((end + 1, node[None]))
+        found.reverse()
+        return found
+
+
+class Transliterator:
+    def __init__(self, lexicon=None, memory=None):
+        # memory is consulted before the lexicon and rules; anything with a
+        # lookup(word) method works, e.g. a TranslationMemory
+        self.memory = memory
+        self.lexicon = dict(LEXICON)
+        if lexicon:
+            self.lexicon.update(lexicon)
+
+        self._trie = _Trie()
+        for pattern, forms in VOWELS.items():
+            self._trie.insert(pattern, ('vowel', pattern, forms))
+        for pattern, letter in CONSONANTS.items():
+            self._trie.insert(pattern, ('consonant', pattern, letter))
+        for pattern, letters in CLUSTERS.items():
+            self._trie.insert(pattern, ('cluster', pattern, letters))
+        for pattern, letters in SYLLABLES.items():
+            self._trie.insert(pattern, ('syllable', pattern, letters))
+
+    def _match(self, word, pos):
+        candidates = self._trie.matches(word, pos)
+        if not candidates and word[pos].isupper():
+            lowered = word[:pos] + word[pos].lower() + word[pos + 1:]
+            candidates = self._trie.matches(lowered, pos)
+
+        for end, payload in candidates:
+            kind, pattern, _ = payload
+            # Let "rri" win over a cluster ending in "r" (grriho -> গৃহ)
+            if kind == 'cluster' and pattern.endswith('r') and word[end:end + 1] == 'r':
+                continue
+            return end, payload
+        return None
+
+    def transliterate_word(self, word):
+        """Return (bengali, confident) for a single alphabetic word."""
+        known = self.memory.lookup(word) if self.memory is not None else None
+        known = known or self.lexicon.get(word) or self.lexicon.get(word.lower())
+        if known:
+            return known, True
+
+        # A capital at the start is sentence case or a name, not a sign
+        # for a retroflex or long vowel
+        confident = not word[0].isupper()
+        if len(word) > 1 and word.isupper():
+            word = word.lower()
+
+        output = []
+        previous = None  # None at word start, then 'vowel' or 'consonant'
+        pos = 0
+        while pos < len(word):
+            match = self._match(word, pos)
+            if match is None:
+                return None, False
+            end, (kind, pattern, value) = match
+
+            if kind == 'vowel':
+                independent, sign = value
+                if previous == 'vowel':
+                    # Runs like "aa" or "oa" that aren't in the vowel table
+                    # are long vowels or glides the rules can't spell
+                    confident = False
+                if previous == 'consonant':
+                    if pattern == 'o' and end < len(word):
+                        # Medial "o" is either the inherent vowel or ো
+                        confident = False
+                    elif pattern == 'e' and end == len(word):
+                        # A final "e" is often an English silent e (time, like)
+                        confident = False
+                        output.append(sign)
+                    else:
+                        if pattern in ('oi', 'ou'):
+                            # "boi" is বই, not বৈ; the rules can't tell which
+                            confident = False
+                        output.append(sign)
+                else:
+                    if pattern == 'o' and previous is None and end < len(word):
+                        # Word-initial "o" can be অ or ও
+                        confident = False
+                    output.append(independent)
+                previous = 'vowel'
+            elif kind == 'syllable':
+                if previous == 'consonant':
+                    confident = False
+                    output.append(HASANTA)
+                output.append(value)
+                previous = 'vowel'
+            else:
+                if pattern in AMBIGUOUS or pattern[:2] in AMBIGUOUS or pattern[0] in AMBIGUOUS:
+                    confident = False
+                if pattern == 'y' and previous == 'consonant':
+                    output.append(YA_PHALA)
+                elif pattern == 'ng' and end == len(word):
+                    output.append('ং')
+                else:
+                    if previous == 'consonant':
+                        # Conjuncts outside the cluster table are guesswork
+                        confident = False
+                        output.append(HASANTA)
+                    output.append(value)
+                previous = 'consonant'
+            pos = end
+
+        return ''.join(output), confident
+
+    def transliterate(self, text):
+        """Split text into segments, transliterating every word the rules resolve."""
+        segments = []
+        for token in _TOKEN_RE.findall(text):
+            if not token[0].isascii() or not token[0].isalpha():
+                segments.append(Segment(token, token, True))
+                continue
+            bengali, confident = self.transliterate_word(token)
+            if confident:
+                segments.append(Segment(token, bengali, True))
+            else:
+                segments.append(Segment(token, None, False))
+        return segments
+
+    def draft(self, text):
+        """Transliterate text, leaving unresolved spans for the caller to fill."""
+        return Draft(self.transliterate(text))
+
+    def convert(self, text, fallback):
+        """Convert text locally, handing unresolved spans to fallback.
+
+        fallback receives a list of Banglish spans and must return their
+        Bengali translations in the same order, or None if it could not,
+        in which case convert returns None as well.
+        """
+        draft = self.draft(text)
+        return draft.fill(fallback(draft.pending) if draft.pending else [])
+
+
+class Draft:
+    """A partly transliterated text; pending lists the spans still to convert."""
+
+    def __init__(self, segments):
+        self.segments = segments
+        self.spans = unresolved_spans(segments)
+        self.pending = [''.join(s.source for s in segments[start:stop]) for start, stop in self.spans]
+
+    def fill(self, translations):
+        """Return the full Bengali text, or None if translations don't line up."""
+        if translations is None or len(translations) != len(self.spans):
+            return None
+        segments = list(self.segments)
+        for (start, stop), source, translation in reversed(list(zip(self.spans, self.pending, translations))):
+            segments[start:stop] = [Segment(source, translation, True)]
+        return ''.join(s.target for s in segments)
+
+    def gaps(self):
+        """Return the resolved text before each pending span and after the last."""
+        gaps = []
+        last = 0
+        for start, stop in self.spans:
+            gaps.append(''.join(s.target for s in self.segments[last:start]))
+            last = stop
+        gaps.append(''.join(s.target for s in self.segments[last:]))
+        return gaps
+
+
+def unresolved_spans(segments):
+    """Return (start, stop) index ranges covering runs of unresolved words.
+
+    Unresolved words separated only by spaces are kept together so the
+    model sees them in context.
+    """
+    spans = []
+    start = None
+    last_unresolved = None
+    for index, segment in enumerate(segments):
+        if not segment.resolved:
+            if start is None:
+                start = index
+            last_unresolved = index
+        elif start is not None and not _SPAN_JOINER_RE.fullmatch(segment.source):
+            spans.append((start, last_unresolved + 1))
+            start = None
+    if start is not None:
+        spans.append((start, last_unresolved + 1))
+    return spans
@@ -0,0 +1,13 @@
+"""The suite runs offline against the fakes the benchmarks use.
+
+fakes.install() has to patch pymongo before config.database is first
+imported, and any test module may import it, so it runs here before the
+tests are collected. Without mongomock the tests that need it skip.
+"""
+try:
+    import mongomock  # noqa: F401
+except ImportError:
+    pass
+else:
+    from benchmarks import fakes
+    fakes.install(latency=0)
@@ -0,0 +1,41 @@
+from datetime import datetime
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+from services.analytics_store import AnalyticsStore
+
+mongomock = pytest.importorskip('mongomock')
+
+NOW = datetime(2026, 10, 18, 14, 30)
+
+
+class FailFirstWrite:
+    """A collection whose first bulk write fails its first request, the way
+    an unordered bulk write reports one rejected update."""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.failed = False
+
+    def bulk_write(self, requests, ordered=True):
+        if self.failed:
+            return self.collection.bulk_write(requests, ordered=ordered)
+        self.failed = True
+        self.collection.bulk_write(requests[1:], ordered=ordered)
+        raise BulkWriteError({'writeErrors': [{'index': 0, 'code': 56, 'errmsg': 'rejected'}]})
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+
+def test_partial_bulk_write_failure_retries_only_the_failed_upserts():
+    collection = mongomock.MongoClient().db.analytics
+    store = AnalyticsStore(collection=FailFirstWrite(collection))
+    store.record_translation('আমি ভালো আছি', 'ami bhalo achi', now=NOW)
+    store.flush()
+    store.flush()
+
+    counts = {doc['_id']: doc.get('documents') for doc in collection.find()}
+    assert counts == {'total': 1, 'day:2026-10-18': 1, 'hour:2026-10-18T14': 1}
+
@@ -0,0 +1,25 @@
+from services.contribution_dedup import DedupIndex
+
+BANGLISH = 'ami tomake onek bhalobashi ar sob somoy tomar kotha bhabi'
+BENGALI = 'আমি তোমাকে অনেক ভালোবাসি আর সব সময় তোমার কথা ভাবি'
+
+
+def make_index():
+    index = DedupIndex()
+    index.add('original', BANGLISH, BENGALI)
+    return index
+
+
+def test_exact_duplicate_ignores_case_and_punctuation():
+    assert make_index().find(BANGLISH.upper() + '!', BENGALI + '।') == ('original', 'exact')
+
+
+def test_banglish_spelling_variant_is_a_near_duplicate():
+    variant = BANGLISH.replace('bhalobashi', 'valobasi')
+    assert make_index().find(variant, BENGALI) == ('original', 'near')
+
+
+def test_bengali_correction_is_not_a_duplicate():
+    index = DedupIndex()
+    index.add('original', BANGLISH, BENGALI.replace('ভালোবাসি', 'ভালোবাশি'))
+    assert index.find(BANGLISH, BENGALI) is None
@@ -0,0 +1,22 @@
+from services.contribution_examples import ExampleIndex, RecentExamples
+
+GOOD = {'banglish': 'ami bhat khai', 'bengali': 'আমি ভাত খাই', 'feedback': None}
+REJECTED = {'banglish': 'ami bhat khabo', 'bengali': 'ভুল', 'feedback': 'spam'}
+
+
+def test_removed_examples_are_not_rendered():
+    index = ExampleIndex()
+    index.extend([GOOD, REJECTED])
+    index.remove([REJECTED])
+    rendered = index.render('ami bhat khabo')
+    assert 'ভুল' not in rendered
+    assert 'আমি ভাত খাই' in rendered
+    assert len(index) == 1
+
+
+def test_removed_examples_leave_the_recent_ring():
+    recent = RecentExamples(size=10)
+    recent.extend([GOOD, REJECTED])
+    recent.remove([REJECTED])
+    assert 'ভুল' not in recent.rendered
+    assert len(recent) == 1
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from services.contribution_migration import migrate
+
+mongomock = pytest.importorskip('mongomock')
+
+
+def make_collection():
+    collection = mongomock.MongoClient().db.contributions
+    collection.create_index('source_file', unique=True)
+    collection.create_index('content_hash', unique=True)
+    return collection
+
+
+def write(directory, name, banglish, bengali):
+    (directory / name).write_text(
+        json.dumps({'banglish': banglish, 'bengali': bengali}), encoding='utf-8'
+    )
+
+
+def test_duplicate_files_become_votes(tmp_path):
+    collection = make_collection()
+    write(tmp_path, 'a.json', 'ami bhalo achi', 'আমি ভালো আছি')
+    write(tmp_path, 'b.json', 'Ami bhalo achi!', 'আমি ভালো আছি।')
+    write(tmp_path, 'c.json', 'tumi kemon acho', 'তুমি কেমন আছো')
+
+    counts = migrate(tmp_path, collection)
+    assert (counts['inserted'], counts['merged'], counts['skipped']) == (2, 1, 0)
+    stored = collection.find_one({'content_hash': {'$exists': True}, 'votes': 2})
+    assert stored['source_file'] in ('a.json', 'b.json')
+
+    # A file added later that matches a stored contribution adds a vote;
+    # re-running the import counts nothing twice
+    write(tmp_path, 'd.json', 'ami  bhalo achi', 'আমি ভালো আছি')
+    counts = migrate(tmp_path, collection, batch_size=1)
+    assert (counts['inserted'], counts['merged'], counts['skipped']) == (0, 1, 3)
+    assert collection.find_one({'_id': stored['_id']})['votes'] == 3
+
+    counts = migrate(tmp_path, collection)
+    assert (counts['inserted'], counts['merged'], counts['skipped']) == (0, 0, 4)
+    assert collection.find_one({'_id': stored['_id']})['votes'] == 3
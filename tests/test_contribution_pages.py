@@ -0,0 +1,108 @@
+import base64
+from datetime import datetime
+
+import pytest
+from bson.objectid import ObjectId
+
+from models.contribution import Contribution, decode_cursor, encode_cursor
+
+mongomock = pytest.importorskip('mongomock')
+
+T1 = datetime(2026, 10, 1, 9, 0)
+T2 = datetime(2026, 10, 2, 9, 0)
+T3 = datetime(2026, 10, 3, 9, 0)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = mongomock.MongoClient().db
+    monkeypatch.setattr('models.contribution.db', db)
+    return db
+
+
+def insert(db, submitted_at, status='pending', user_id=None):
+    return db.contributions.insert_one({
+        'banglish': 'ami', 'bengali': 'আমি', 'feedback': None, 'status': status,
+        'submitted_at': submitted_at, 'user_id': user_id, 'votes': 1
+    }).inserted_id
+
+
+def all_pages(limit, **kwargs):
+    ids, cursor = [], None
+    while True:
+        page, cursor = Contribution.list_page(cursor=cursor, limit=limit, **kwargs)
+        ids.extend(c._id for c in page)
+        if cursor is None:
+            return ids
+
+
+def test_pages_break_ties_on_id(db):
+    # Three contributions share a timestamp, so a page boundary falls
+    # between them and only the _id tie-break keeps them apart
+    tied = sorted(insert(db, T2) for _ in range(3))
+    oldest, newest = insert(db, T1), insert(db, T3)
+
+    expected = [str(i) for i in [newest, *reversed(tied), oldest]]
+    assert all_pages(limit=2) == expected
+    assert all_pages(limit=1, newest_first=False) == expected[::-1]
+
+
+def test_filters_apply_on_every_page(db):
+    mine = [insert(db, T1, user_id='u1'), insert(db, T2, user_id='u1'), insert(db, T3, user_id='u1')]
+    insert(db, T2, user_id='u2')
+    assert all_pages(limit=2, user_id='u1') == [str(i) for i in reversed(mine)]
+
+
+def test_review_queue_is_pending_oldest_first(db):
+    later = insert(db, T3)
+    insert(db, T1, status='approved')
+    earlier = insert(db, T2)
+
+    page, cursor = Contribution.get_pending_contributions(limit=1)
+    assert [c._id for c in page] == [str(earlier)]
+    page, cursor = Contribution.get_pending_contributions(cursor=cursor, limit=1)
+    assert [c._id for c in page] == [str(later)]
+    assert cursor is None
+
+
+def test_cursor_round_trip():
+    contribution_id = ObjectId()
+    assert decode_cursor(encode_cursor(T2, contribution_id)) == (T2, contribution_id)
+
+
+@pytest.mark.parametrize('cursor', [
+    'not a cursor!',
+    'ü',
+    base64.urlsafe_b64encode(b'no separator').decode(),
+    base64.urlsafe_b64encode(b'yesterday|' + str(ObjectId()).encode()).decode(),
+    base64.urlsafe_b64encode(b'2026-10-02T09:00:00|not-an-id').decode(),
+    base64.urlsafe_b64encode(b'\xff\xfe').decode(),
+])
+def test_malformed_cursors_are_rejected(db, cursor):
+    with pytest.raises(ValueError, match='Invalid page cursor'):
+        Contribution.list_page(cursor=cursor)
+
+
+def test_review_many_reports_each_id(db, monkeypatch):
+    monkeypatch.setattr('models.contribution.REVIEW_BATCH_SIZE', 2)
+    approved = []
+    monkeypatch.setattr('models.contribution._approval_listeners', [approved.append])
+    pending = [insert(db, T1), insert(db, T2)]
+    already = insert(db, T3, status='approved')
+    missing = ObjectId()
+
+    ids = [str(pending[0]), 'nope', str(already), str(missing), str(pending[1]), None]
+    results = Contribution.approve_many(ids, reviewer_id='admin')
+
+    assert results == [
+        {'contribution_id': str(pending[0]), 'result': 'approved'},
+        {'contribution_id': 'nope', 'result': 'invalid_id'},
+        {'contribution_id': str(already), 'result': 'unchanged'},
+        {'contribution_id': str(missing), 'result': 'not_found'},
+        {'contribution_id': str(pending[1]), 'result': 'approved'},
+        {'contribution_id': None, 'result': 'invalid_id'},
+    ]
+    assert db.contributions.count_documents({'status': 'approved', 'reviewer_id': 'admin'}) == 2
+    # Listeners run once for the whole call, with only the changed contributions
+    assert len(approved) == 1
+    assert sorted(c._id for c in approved[0]) == sorted(str(i) for i in pending)
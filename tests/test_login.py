@@ -0,0 +1,79 @@
+import asyncio
+import json
+import os
+import threading
+
+import pytest
+
+from services.password_hashing import HasherBusy
+
+pytest.importorskip('mongomock')
+
+
+@pytest.fixture(scope='module')
+def app_module():
+    os.environ.setdefault('BCRYPT_ROUNDS', '4')
+    import app
+    app.startup.wait(30)
+    from models.user import User
+    User('login-test', 'login@example.com', 'secret').save()
+    return app
+
+
+def call(app_module, method, path, payload=None, cookie=None):
+    """Send one request through the ASGI app; return (status, headers, body)."""
+    body = json.dumps(payload or {}).encode('utf-8')
+    headers = [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+    if cookie:
+        headers.append((b'cookie', cookie.encode('latin-1')))
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': method, 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'query_string': b'', 'root_path': '', 'headers': headers,
+        'client': ('127.0.0.1', 0), 'server': ('127.0.0.1', 5000)
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app_module.asgi_app(scope, receive, send))
+    response_headers = {name.decode('latin-1'): value.decode('latin-1') for name, value in sent[0]['headers']}
+    return sent[0]['status'], response_headers, b''.join(m.get('body', b'') for m in sent[1:])
+
+
+def test_login_sets_a_session_flask_accepts(app_module):
+    status, headers, body = call(app_module, 'POST', '/login', {'email': 'login@example.com', 'password': 'secret'})
+    assert status == 200 and json.loads(body) == {'success': True}
+    cookie = headers['set-cookie'].split(';')[0]
+
+    assert call(app_module, 'GET', '/')[0] == 302
+    assert call(app_module, 'GET', '/', cookie=cookie)[0] == 200
+
+
+def test_wrong_password_is_refused(app_module):
+    status, headers, body = call(app_module, 'POST', '/login', {'email': 'login@example.com', 'password': 'wrong'})
+    assert status == 200 and not json.loads(body)['success']
+    assert 'set-cookie' not in headers
+
+
+def test_sign_ins_get_429_while_hash_slots_are_full(app_module):
+    from models.user import password_hasher
+    release = threading.Event()
+    try:
+        with pytest.raises(HasherBusy):
+            while True:
+                password_hasher._submit(release.wait)
+
+        status, headers, _ = call(app_module, 'POST', '/login', {'email': 'login@example.com', 'password': 'secret'})
+        assert (status, headers.get('retry-after')) == (429, '1')
+        status, _, _ = call(app_module, 'POST', '/signup', {'username': 'x', 'email': 'x@example.com', 'password': 'x'})
+        assert status == 429
+    finally:
+        release.set()
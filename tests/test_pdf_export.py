@@ -0,0 +1,33 @@
+import threading
+
+from services.pdf_export import create_pdf, font_key_for
+
+LETTERS = [chr(codepoint) for codepoint in range(0x0985, 0x09B9)]
+
+
+def test_concurrent_exports_share_fonts():
+    # Each export subsets different glyphs of the same registered font,
+    # which raised IndexError when two documents saved at once
+    errors = []
+
+    def export(n):
+        try:
+            for i in range(10):
+                text = ' '.join(LETTERS[(n * 7 + i + k) % len(LETTERS)] * 3 for k in range(40))
+                assert create_pdf(text, 'শিরোনাম', 'ক্যাপশন').read(5) == b'%PDF-'
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=export, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_unknown_fonts_fall_back_to_kalpurush():
+    # The key names a field in the analytics counters, so it must be a known one
+    assert font_key_for('nikosh') == 'nikosh'
+    for choice in ('', 'a.', '$x', None):
+        assert font_key_for(choice) == 'kalpurush'
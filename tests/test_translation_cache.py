@@ -0,0 +1,31 @@
+import pytest
+
+from services.translation_cache import TranslationCache
+
+mongomock = pytest.importorskip('mongomock')
+
+
+def test_invalidation_reaches_other_workers_after_local_ttl(monkeypatch):
+    collection = mongomock.MongoClient().db.translation_cache
+    clock = [1000.0]
+    monkeypatch.setattr('services.translation_cache.time.time', lambda: clock[0])
+    worker, other = (TranslationCache(collection=collection, local_ttl=60) for _ in range(2))
+
+    worker.set('convert', 'ami bhalo achi', 1, 'আমি ভালো আছি')
+    assert other.get('convert', 'ami bhalo achi', 1) == 'আমি ভালো আছি'
+
+    worker.invalidate_words(['bhalo'])
+    assert worker.get('convert', 'ami bhalo achi', 1) is None
+    # The other worker's LRU still holds the entry until local_ttl runs out
+    assert other.get('convert', 'ami bhalo achi', 1) == 'আমি ভালো আছি'
+    clock[0] += 61
+    assert other.get('convert', 'ami bhalo achi', 1) is None
+
+
+def test_without_a_collection_entries_keep_the_full_ttl(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr('services.translation_cache.time.time', lambda: clock[0])
+    cache = TranslationCache(ttl=3600, local_ttl=60)
+    cache.set('convert', 'ami', 1, 'আমি')
+    clock[0] += 600
+    assert cache.get('convert', 'ami', 1) == 'আমি'
@@ -0,0 +1,90 @@
+import pytest
+
+from services.transliterator import Transliterator
+
+# word -> (expected Bengali, confident). Unconfident words go to Gemini,
+# so their rule-based output only matters for the confident flag.
+WORDS = {
+    # Lexicon, whatever the case
+    'tumi': ('তুমি', True),
+    'Ami': ('আমি', True),
+    'AMI': ('আমি', True),
+    'kemon': ('কেমন', True),
+    'ei': ('এই', True),
+    'kI': ('কী', True),
+    'dUr': ('দূর', True),
+    # Rules, for letters with a single reading
+    'khabo': ('খাবো', True),
+    'kheli': ('খেলি', True),
+    'pakhi': ('পাখি', True),
+    'phul': ('ফুল', True),
+    'mama': ('মামা', True),
+    'gram': ('গ্রাম', True),
+    'shri': ('শ্রী', True),
+    # Letters with more than one reading: t/d/n, r, j, s/sh, c/ch
+    'bhat': (None, False),
+    'dhan': (None, False),
+    'ghuri': (None, False),
+    'jabe': (None, False),
+    'jete': (None, False),
+    'jay': (None, False),
+    'eta': (None, False),
+    'seta': (None, False),
+    'ashe': (None, False),
+    'chini': (None, False),
+    'chup': (None, False),
+    'mach': (None, False),
+    'jama': (None, False),
+    # English words: silent final "e" and ambiguous letters
+    'time': (None, False),
+    'like': (None, False),
+    'game': (None, False),
+    'sir': (None, False),
+    # Vowel runs that aren't table diphthongs
+    'naam': (None, False),
+    'gaan': (None, False),
+    'raat': (None, False),
+    'paani': (None, False),
+    'khaoa': (None, False),
+    # Capital at the start of a word
+    'Rahim': (None, False),
+    'Ice': (None, False),
+    # Bare "c"
+    'Facebook': (None, False),
+    'America': (None, False),
+    'cat': (None, False),
+    # Medial "oi" and "ou" can be two vowels
+    'boi': (None, False),
+    'bou': (None, False),
+    # Medial "o" and guessed conjuncts
+    'nodi': (None, False),
+    'brishti': (None, False),
+}
+
+
+@pytest.fixture(scope='module')
+def transliterator():
+    return Transliterator()
+
+
+@pytest.mark.parametrize('word, expected', WORDS.items())
+def test_transliterate_word(transliterator, word, expected):
+    bengali, confident = transliterator.transliterate_word(word)
+    expected_bengali, expected_confident = expected
+    assert confident is expected_confident
+    if expected_confident:
+        assert bengali == expected_bengali
+
+
+def test_unconfident_words_are_left_for_gemini(transliterator):
+    draft = transliterator.draft('ami Facebook e boi pori')
+    assert draft.pending == ['Facebook', 'boi pori']
+    assert draft.fill(['ফেসবুক', 'বই পড়ি']) == 'আমি ফেসবুক এ বই পড়ি'
+
+
+def test_gaps_surround_the_pending_spans(transliterator):
+    draft = transliterator.draft('ami Facebook e boi pori, tumi?')
+    assert draft.gaps() == ['আমি ', ' এ ', ', তুমি?']
+    translations = ['ফেসবুক', 'বই পড়ি']
+    gaps = draft.gaps()
+    assert gaps[0] + ''.join(t + gap for t, gap in zip(translations, gaps[1:])) == draft.fill(translations)